@@ -0,0 +1,332 @@
+"""
+Pool of warm headless Chrome instances shared by the scrapers.
+
+Starting Chrome (and resolving chromedriver) dominates a short scrape, so
+each process keeps up to BROWSER_POOL_SIZE browsers running and hands them
+out per job:
+
+    with browser_session() as session:
+        html = session.get(url, wait_for=".tool-item")
+
+Every session runs in its own browser context (separate cookies, storage
+and cache), so jobs don't see each other's state. Where the driver can't
+create one (no CDP, e.g. a remote driver), the session gets the browser to
+itself and the browser is replaced afterwards. A browser is also replaced
+after BROWSER_MAX_PAGES page loads, or as soon as it stops responding.
+"""
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+# Page loads before a browser is restarted (bounds leaks in long runs)
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "50"))
+# Seconds a job waits for a free browser
+BROWSER_ACQUIRE_TIMEOUT = float(os.getenv("BROWSER_ACQUIRE_TIMEOUT", "120"))
+BROWSER_PAGE_LOAD_TIMEOUT = float(os.getenv("BROWSER_PAGE_LOAD_TIMEOUT", "45"))
+
+# A chromedriver binary to use as-is; otherwise webdriver-manager resolves one
+# and its path is remembered in CHROMEDRIVER_CACHE for later runs
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")
+CHROMEDRIVER_CACHE = os.getenv(
+    "CHROMEDRIVER_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "toolcurator", "chromedriver_path")
+)
+
+
+class BrowserUnavailable(Exception):
+    """Raised when no browser could be checked out within the acquire timeout."""
+
+
+def chromedriver_path():
+    """
+    Path of the chromedriver binary, without a network lookup when possible.
+
+    Returns:
+        str: CHROMEDRIVER_PATH, else the cached webdriver-manager path (if the
+        file still exists), else a freshly installed one (which is cached)
+    """
+    if CHROMEDRIVER_PATH:
+        return CHROMEDRIVER_PATH
+    try:
+        with open(CHROMEDRIVER_CACHE, encoding="utf-8") as f:
+            cached = f.read().strip()
+        if cached and os.access(cached, os.X_OK):
+            return cached
+    except OSError:
+        pass
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    path = ChromeDriverManager().install()
+    os.makedirs(os.path.dirname(CHROMEDRIVER_CACHE), exist_ok=True)
+    with open(CHROMEDRIVER_CACHE, "w", encoding="utf-8") as f:
+        f.write(path)
+    return path
+
+
+def chrome_options():
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-blink-features=AutomationControlled")  # Avoid detection
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1366,900")
+    return options
+
+
+def launch_chrome():
+    driver = webdriver.Chrome(service=Service(chromedriver_path()), options=chrome_options())
+    driver.set_page_load_timeout(BROWSER_PAGE_LOAD_TIMEOUT)
+    return driver
+
+
+class PooledBrowser:
+    def __init__(self, driver):
+        self.driver = driver
+        self.home = driver.current_window_handle  # kept open so closing a job's tab never quits Chrome
+        self.pages = 0
+        self.broken = False
+        self.single_use = False  # ran a job outside an isolated context; don't reuse
+        self.started_at = time.monotonic()
+
+    def alive(self):
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class BrowserSession:
+    """
+    One job's isolated view of a pooled browser: a tab in a fresh browser
+    context. Use ``get()`` for page loads (they count towards recycling)
+    or ``driver`` for anything else.
+    """
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.driver = browser.driver
+        self._context = None
+        self._open()
+
+    def _open(self):
+        try:
+            self._context = self.driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+            target = self.driver.execute_cdp_cmd(
+                "Target.createTarget", {"url": "about:blank", "browserContextId": self._context}
+            )["targetId"]
+            self.driver.switch_to.window(target)
+        except WebDriverException:
+            # No CDP contexts (e.g. a remote driver): clearing cookies would leave storage
+            # and cache behind, so this job gets the browser's own profile and it is retired after
+            self._context = None
+            self.browser.single_use = True
+            self.driver.switch_to.new_window("tab")
+
+    def get(self, url, wait_for=None, timeout=30):
+        """
+        Load ``url`` and optionally wait for a CSS selector to appear.
+
+        Returns:
+            str: The rendered page source
+        """
+        self.browser.pages += 1
+        self.driver.get(url)
+        if wait_for:
+            WebDriverWait(self.driver, timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, wait_for))
+            )
+        return self.driver.page_source
+
+    def close(self):
+        self.driver.close()
+        self.driver.switch_to.window(self.browser.home)
+        if self._context is not None:
+            self.driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": self._context})
+
+
+class BrowserPool:
+    """
+    Up to ``size`` Chrome instances, launched on demand, each serving one
+    session at a time. Callers block for up
+    to ``acquire_timeout`` seconds when all are busy.
+    """
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_pages=BROWSER_MAX_PAGES,
+                 acquire_timeout=BROWSER_ACQUIRE_TIMEOUT, launch=launch_chrome):
+        self.size = size
+        self.max_pages = max_pages
+        self.acquire_timeout = acquire_timeout
+        self.launch = launch
+        self.pid = os.getpid()
+
+        self._cond = threading.Condition()
+        self._idle = []
+        self._opened = 0
+        self._closed = False
+
+        self._launches = 0
+        self._recycled = 0
+        self._crashes = 0
+        self._sessions = 0
+        self._waits = 0
+        self._total_launch = 0.0
+
+    def _launch(self):
+        started = time.perf_counter()
+        driver = self.launch()
+        try:
+            browser = PooledBrowser(driver)
+        except Exception:
+            driver.quit()
+            raise
+        with self._cond:
+            self._launches += 1
+            self._total_launch += time.perf_counter() - started
+        return browser
+
+    def _acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cond:
+            if self._closed:
+                raise BrowserUnavailable("Browser pool is closed")
+            while not self._idle and self._opened >= self.size:
+                self._waits += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    raise BrowserUnavailable(f"No browser available within {self.acquire_timeout}s")
+            if self._idle:
+                self._sessions += 1
+                return self._idle.pop()
+            self._opened += 1
+            self._sessions += 1
+
+        try:
+            return self._launch()
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, browser):
+        if browser.broken or browser.single_use or browser.pages >= self.max_pages or self._closed:
+            with self._cond:
+                self._opened -= 1
+                if browser.broken:
+                    self._crashes += 1
+                else:
+                    self._recycled += 1
+                self._cond.notify()
+            browser.quit()
+            return
+        with self._cond:
+            self._idle.append(browser)
+            self._cond.notify()
+
+    @contextmanager
+    def session(self):
+        """
+        Borrow a browser for one job, in a fresh browser context.
+
+        The browser is recycled afterwards if it reached ``max_pages``, and
+        discarded if it stopped responding (crashed renderer, dead driver).
+        """
+        browser = self._acquire()
+        try:
+            session = BrowserSession(browser)
+        except Exception:
+            browser.broken = True
+            self._release(browser)
+            raise
+        try:
+            yield session
+        except WebDriverException as e:
+            if not isinstance(e, TimeoutException) and not browser.alive():
+                browser.broken = True
+            raise
+        finally:
+            if not browser.broken:
+                try:
+                    session.close()
+                except WebDriverException:
+                    browser.broken = True
+            self._release(browser)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+        for browser in idle:
+            browser.quit()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._opened,
+                "idle": len(self._idle),
+                "sessions": self._sessions,
+                "waits": self._waits,
+                "launches": self._launches,
+                "avg_launch_s": round(self._total_launch / self._launches, 2) if self._launches else 0.0,
+                "recycled": self._recycled,
+                "crashes": self._crashes,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """
+    Return the process-wide pool, creating it on first use.
+    """
+    global _pool
+    pool = _pool
+    if pool is None or pool.pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid():
+                _pool = BrowserPool()
+            pool = _pool
+    return pool
+
+
+def browser_session():
+    return get_browser_pool().session()
+
+
+def _close_pool():
+    if _pool is not None and _pool.pid == os.getpid():
+        _pool.close()
+
+
+def _forget_pool_after_fork():
+    # The parent owns the Chrome processes; the child launches its own
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+atexit.register(_close_pool)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_pool_after_fork)
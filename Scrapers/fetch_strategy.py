@@ -0,0 +1,254 @@
+"""
+HTTP-first page fetching for scraper sources, with a headless-browser fallback.
+
+Most directory pages render their cards server-side, so a plain GET plus an
+lxml parse is enough and costs a fraction of a Chrome page load. A
+FetchStrategy tries, in order:
+
+    1. http          backend.http_client GET
+    2. cloudscraper  only when the GET was refused (403/429/503) and
+                     cloudscraper is installed
+    3. browser       a Scrapers.browser_pool session
+
+and accepts the first page on which every ``required`` CSS selector matches.
+Each source records which path won, and a source whose HTTP fetches keep
+coming back incomplete goes straight to the browser, re-probing HTTP every
+FETCH_HTTP_REPROBE fetches.
+"""
+import os
+import threading
+import time
+
+from bs4 import BeautifulSoup
+
+try:
+    import cloudscraper
+except ImportError:  # Optional; refused requests then go straight to the browser
+    cloudscraper = None
+
+from backend.http_client import http_get
+from Scrapers.browser_pool import browser_session
+
+FETCH_HTTP_TIMEOUT = (5, 20)  # (connect, read) seconds
+FETCH_BROWSER_TIMEOUT = float(os.getenv("FETCH_BROWSER_TIMEOUT", "30"))
+# Consecutive escalations after which a source skips HTTP
+FETCH_BROWSER_STICKY = int(os.getenv("FETCH_BROWSER_STICKY", "3"))
+# While skipping HTTP, retry it once every this many fetches
+FETCH_HTTP_REPROBE = int(os.getenv("FETCH_HTTP_REPROBE", "10"))
+
+# Statuses bot protection answers with; worth a cloudscraper attempt
+CHALLENGE_STATUSES = (403, 429, 503)
+
+PATHS = ("http", "cloudscraper", "browser")
+
+
+class FetchError(Exception):
+    """Raised when no path produced a page with the required selectors."""
+
+
+class FetchedPage:
+    def __init__(self, url, html, soup, path):
+        self.url = url
+        self.html = html
+        self.soup = soup
+        self.path = path  # "http", "cloudscraper" or "browser"
+
+
+class SourceFetchStats:
+    def __init__(self):
+        self.wins = dict.fromkeys(PATHS, 0)
+        self.seconds = dict.fromkeys(PATHS, 0.0)
+        self.attempts = dict.fromkeys(PATHS, 0)
+        self.escalations = {}  # reason -> count
+        self.failures = 0
+        self.consecutive_escalations = 0
+        self.sticky_fetches = 0
+        self.skipped_http = 0
+
+    def snapshot(self):
+        return {
+            "wins": dict(self.wins),
+            "attempts": dict(self.attempts),
+            "avg_ms": {
+                path: round(self.seconds[path] / self.attempts[path] * 1000, 1)
+                for path in PATHS if self.attempts[path]
+            },
+            "escalations": dict(self.escalations),
+            "failures": self.failures,
+            "http_skipped": self.skipped_http,
+        }
+
+
+def _parse(html):
+    return BeautifulSoup(html, "lxml")
+
+
+def _missing(soup, required):
+    return [selector for selector in required if soup.select_one(selector) is None]
+
+
+def _browser_fetch(url, wait_for, timeout):
+    with browser_session() as session:
+        return session.get(url, wait_for=wait_for, timeout=timeout)
+
+
+class FetchStrategy:
+    """
+    Fetches pages of one source, HTTP first and the browser only when needed.
+
+    Args:
+        source (str): Name the stats are recorded under
+        required (tuple): CSS selectors that must all match for a page to count
+        wait_for (str): Selector the browser waits for (default: the first required one)
+        http_fetch (callable): url -> requests.Response (default: backend.http_client GET)
+        browser_fetch (callable): (url, wait_for, timeout) -> HTML (default: a pooled browser)
+    """
+
+    def __init__(self, source, required, wait_for=None, http_fetch=None, browser_fetch=_browser_fetch,
+                 browser_timeout=FETCH_BROWSER_TIMEOUT):
+        self.source = source
+        self.required = tuple(required)
+        self.wait_for = wait_for or (self.required[0] if self.required else None)
+        self.http_fetch = http_fetch or (lambda url: http_get(url, timeout=FETCH_HTTP_TIMEOUT))
+        self.browser_fetch = browser_fetch
+        self.browser_timeout = browser_timeout
+
+        self._lock = threading.Lock()
+        self._stats = SourceFetchStats()
+        self._scraper = None
+
+    def _record(self, path, started):
+        with self._lock:
+            self._stats.attempts[path] += 1
+            self._stats.seconds[path] += time.perf_counter() - started
+
+    def _escalate(self, reason):
+        with self._lock:
+            self._stats.escalations[reason] = self._stats.escalations.get(reason, 0) + 1
+
+    def _win(self, path):
+        with self._lock:
+            self._stats.wins[path] += 1
+            if path == "browser":
+                self._stats.consecutive_escalations += 1
+            else:
+                self._stats.consecutive_escalations = 0
+
+    def _skip_http(self):
+        with self._lock:
+            stats = self._stats
+            if stats.consecutive_escalations < FETCH_BROWSER_STICKY:
+                return False
+            stats.sticky_fetches += 1
+            # Every FETCH_HTTP_REPROBE-th fetch tries HTTP again in case the site changed
+            if stats.sticky_fetches % FETCH_HTTP_REPROBE == 0:
+                return False
+            stats.skipped_http += 1
+            return True
+
+    def _cloudscraper_get(self, url):
+        with self._lock:
+            if self._scraper is None:
+                self._scraper = cloudscraper.create_scraper()
+            scraper = self._scraper
+        return scraper.get(url, timeout=FETCH_HTTP_TIMEOUT)
+
+    def _try_http(self, url):
+        """
+        Returns:
+            FetchedPage or None: None (after recording why) when the browser is needed
+        """
+        started = time.perf_counter()
+        try:
+            response = self.http_fetch(url)
+        except Exception:
+            self._record("http", started)
+            self._escalate("http error")
+            return None
+        self._record("http", started)
+
+        path = "http"
+        if response.status_code in CHALLENGE_STATUSES and cloudscraper is not None:
+            self._escalate(f"http {response.status_code}")
+            started = time.perf_counter()
+            try:
+                response = self._cloudscraper_get(url)
+            except Exception:
+                self._record("cloudscraper", started)
+                self._escalate("cloudscraper error")
+                return None
+            self._record("cloudscraper", started)
+            path = "cloudscraper"
+
+        if response.status_code >= 400:
+            self._escalate(f"{path} {response.status_code}")
+            return None
+        soup = _parse(response.text)
+        if _missing(soup, self.required):
+            self._escalate(f"{path} missing selectors")
+            return None
+        return FetchedPage(url, response.text, soup, path)
+
+    def fetch(self, url):
+        """
+        Fetch ``url`` by the cheapest path that yields every required selector.
+
+        Returns:
+            FetchedPage: HTML, its parsed soup and the path that produced it;
+            raises FetchError when even the browser page lacks the selectors
+        """
+        if not self._skip_http():
+            page = self._try_http(url)
+            if page is not None:
+                self._win(page.path)
+                return page
+
+        started = time.perf_counter()
+        try:
+            html = self.browser_fetch(url, self.wait_for, self.browser_timeout)
+        except Exception as e:
+            with self._lock:
+                self._stats.failures += 1
+            raise FetchError(f"{self.source}: browser fetch of {url} failed: {e}") from e
+        finally:
+            self._record("browser", started)
+
+        soup = _parse(html)
+        missing = _missing(soup, self.required)
+        if missing:
+            with self._lock:
+                self._stats.failures += 1
+            raise FetchError(f"{self.source}: {url} has no {', '.join(missing)} even in the browser")
+        self._win("browser")
+        return FetchedPage(url, html, soup, "browser")
+
+    def stats(self):
+        with self._lock:
+            return self._stats.snapshot()
+
+
+_strategies = {}
+_strategies_lock = threading.Lock()
+
+
+def get_strategy(source, required, **kwargs):
+    """
+    Return the process-wide strategy for ``source``, creating it on first use
+    (so stats and HTTP skipping carry over between scrapes in one process).
+    """
+    with _strategies_lock:
+        strategy = _strategies.get(source)
+        if strategy is None:
+            strategy = _strategies[source] = FetchStrategy(source, required, **kwargs)
+        return strategy
+
+
+def fetch_stats():
+    """
+    Returns:
+        dict: source -> wins per path, attempts, average ms per path,
+        escalation reasons and failures
+    """
+    with _strategies_lock:
+        strategies = list(_strategies.values())
+    return {strategy.source: strategy.stats() for strategy in strategies}
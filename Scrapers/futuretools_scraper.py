@@ -1,17 +1,21 @@
-import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+import argparse
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 import psycopg2
-import time
 import os
+import sys
+import urllib.parse
 from dotenv import load_dotenv
 
+# Make the project root importable when run as a script (python Scrapers/...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.http_client import http_get
+from backend.schema import run_migrations
+from backend.tool_writer import write_tools
+from Scrapers.browser_pool import browser_session
+from Scrapers.redirect_resolver import get_resolver, resolve_redirects
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -24,119 +28,155 @@ DB_CONFIG = {
     "port": os.getenv("DB_PORT")
 }
 
+BASE_URL = "https://www.futuretools.io"
+LISTING_URL = f"{BASE_URL}/newly-added"
+
+# Tools taken from the top of the listing per run (0 = the whole listing)
+FUTURETOOLS_DEPTH = int(os.getenv("FUTURETOOLS_DEPTH", "5")) or None
+# Detail pages fetched in parallel (redirects: see Scrapers/redirect_resolver.py)
+FUTURETOOLS_WORKERS = int(os.getenv("FUTURETOOLS_WORKERS", "4"))
+DETAIL_TIMEOUT = (5, 20)  # (connect, read) seconds
+
 
 # Function to connect to PostgreSQL
 def connect_db():
     return psycopg2.connect(**DB_CONFIG)
 
 
-# Function to create table if it doesn't exist
-def create_table():
-    conn = connect_db()
-    cur = conn.cursor()
-    cur.execute('''
-        CREATE TABLE IF NOT EXISTS ai_tools (
-            id SERIAL PRIMARY KEY,
-            name TEXT,
-            short_description TEXT,
-            full_description TEXT,
-            category TEXT,
-            source TEXT,
-            source_url TEXT UNIQUE
-        )
-    ''')
-    conn.commit()
-    cur.close()
-    conn.close()
-
-
 # Function to get the actual tool URL by following the redirect
 def get_final_url(redirect_url):
-    try:
-        response = requests.get(redirect_url, allow_redirects=True, timeout=10)
-        return response.url  # This is the actual AI tool website
-    except requests.exceptions.RequestException as e:
-        print(f"[ERROR] Failed to follow redirect for {redirect_url}: {e}")
-        return redirect_url  # Fall back to original if error occurs
+    # Falls back to the original URL if the redirect couldn't be followed
+    return resolve_redirects([redirect_url]).get(redirect_url, redirect_url)
 
 
-# Function to scrape FutureTools.io Newly Added page
-def scrape_futuretools():
-    url = "https://www.futuretools.io/newly-added"
+def _text(card, class_name):
+    element = card.find(class_=class_name)
+    return element.get_text().strip() if element else ""
 
-    # Set up Selenium WebDriver (no headless mode so you can see it)
-    chrome_options = Options()
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")  # Avoid detection
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
 
-    print("[INFO] Opening FutureTools.io Newly Added page in Chrome...")
-    driver.get(url)
+def parse_listing(html, depth=FUTURETOOLS_DEPTH, base_url=BASE_URL):
+    """
+    Extract tool cards from a rendered "Newly Added" listing page.
 
-    tools = []
-
-    for i in range(5):  # Limit to first 5 tools
-        # Refresh the page before each iteration to avoid stale elements
-        driver.get(url)
-        time.sleep(3)  # Allow time for page reload
+    Args:
+        html (str): Listing page HTML (live page source or a saved fixture)
+        depth (int or None): Number of cards to take from the top; None (or 0) takes all
+        base_url (str): Base for the cards' relative detail links
 
+    Returns:
+        list: Dicts with name, short_description, category and detail_url
+    """
+    soup = BeautifulSoup(html, "lxml")
+    cards = []
+    for card in soup.find_all("div", class_="tool-item-columns-new"):
+        if depth and len(cards) >= depth:
+            break
+        link = card.find(class_="tool-item-link-block---new")
+        if link is None or not link.get("href"):
+            print("[ERROR] Skipping a card without a tool page link")
+            continue
+        cards.append({
+            "name": _text(card, "tool-item-link---new"),
+            "short_description": _text(card, "tool-item-description-box---new"),
+            "category": _text(card, "link-block-7") or "Unknown",
+            "detail_url": urllib.parse.urljoin(base_url, link["href"]),
+        })
+    return cards
+
+
+def parse_detail(html):
+    """
+    Extract the outbound link and full description from a tool page.
+
+    Returns:
+        tuple: (redirect URL or "", full description or "")
+    """
+    soup = BeautifulSoup(html, "lxml")
+    redirect_url_tag = soup.find("a", class_="link-block-2")
+    redirect_url = redirect_url_tag.get("href", "") if redirect_url_tag else ""
+    full_description_tag = soup.find("div", class_="rich-text-block w-richtext")
+    full_description = full_description_tag.get_text().strip() if full_description_tag else ""
+    return redirect_url, full_description
+
+
+def fetch_listing_html():
+    """
+    Load the listing once in Chrome and return its rendered HTML.
+    """
+    with browser_session() as session:
+        print("[INFO] Opening FutureTools.io Newly Added page in Chrome...")
+        html = session.get(LISTING_URL, wait_for=".tool-item-columns-new", timeout=30)
+        print("[INFO] AI tools have loaded.")
+        return html
+
+
+def fetch_detail_html(detail_url):
+    # Tool pages are server-rendered, so plain HTTP is enough
+    response = http_get(detail_url, timeout=DETAIL_TIMEOUT)
+    response.raise_for_status()
+    return response.text
+
+
+def _slug(detail_url):
+    return urllib.parse.urlsplit(detail_url).path.rstrip("/").rsplit("/", 1)[-1] or "index"
+
+
+def scrape_futuretools(depth=FUTURETOOLS_DEPTH, workers=FUTURETOOLS_WORKERS, listing_html=None,
+                       fetch_detail=fetch_detail_html, resolve=resolve_redirects, save_dir=None):
+    """
+    Scrape FutureTools.io "Newly Added": one listing snapshot, then the
+    tool pages of the first ``depth`` cards fetched in parallel, then every
+    outbound link resolved in one batch.
+
+    Args:
+        depth (int or None): Number of tools to collect; None (or 0) collects the whole listing
+        workers (int): Detail pages fetched concurrently
+        listing_html (str or None): Parse this instead of loading the live listing
+        fetch_detail (callable): detail URL -> HTML (swap in a fixture reader to run offline)
+        resolve (callable or None): redirect URLs -> {redirect URL: final URL} (URLs left
+            out are kept as they are); None keeps every redirect URL
+        save_dir (str or None): Also write every fetched page here, for use as fixtures
+
+    Returns:
+        list: (name, short_description, full_description, category, source, source_url) tuples
+    """
+    if listing_html is None:
         try:
-            WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "tool-item-columns-new"))
-            )
-            print("[INFO] AI tools have loaded.")
+            listing_html = fetch_listing_html()
         except Exception as e:
             print("[ERROR] Timeout waiting for AI tool elements:", e)
-            driver.quit()
             return []
+    if save_dir:
+        os.makedirs(os.path.join(save_dir, "tools"), exist_ok=True)
+        with open(os.path.join(save_dir, "listing.html"), "w", encoding="utf-8") as f:
+            f.write(listing_html)
 
-        # Find fresh elements
-        tool_cards = driver.find_elements(By.CLASS_NAME, "tool-item-columns-new")
-        if i >= len(tool_cards):
-            print("[INFO] No more tools found.")
-            break
+    cards = parse_listing(listing_html, depth)
+    print(f"[INFO] Found {len(cards)} tools on the listing")
 
+    def collect(card):
         try:
-            card = tool_cards[i]
-            name_element = card.find_element(By.CLASS_NAME, "tool-item-link---new")
-            name = name_element.text.strip()
-
-            short_description_element = card.find_element(By.CLASS_NAME, "tool-item-description-box---new")
-            short_description = short_description_element.text.strip()
-
-            category_element = card.find_element(By.CLASS_NAME, "link-block-7")
-            category = category_element.text.strip() if category_element else "Unknown"
-
-            tool_page_link_element = card.find_element(By.CLASS_NAME, "tool-item-link-block---new")
-            tool_page_url = tool_page_link_element.get_attribute("href")
-
-            driver.get(tool_page_url)
-            print(f"[INFO] Scraping tool page: {tool_page_url}")
-
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "link-block-2"))
-            )
-
-            html = driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-
-            # Extract the redirect URL
-            redirect_url_tag = soup.find("a", class_="link-block-2")
-            redirect_url = redirect_url_tag["href"] if redirect_url_tag else ""
-
-            # Follow the redirect to get the actual AI tool URL
-            actual_tool_url = get_final_url(redirect_url) if redirect_url else ""
-
-            # Extract full description
-            full_description_tag = soup.find("div", class_="rich-text-block w-richtext")
-            full_description = full_description_tag.text.strip() if full_description_tag else short_description
-
-            tools.append((name, short_description, full_description, category, "FutureTools.io", actual_tool_url))
-
+            print(f"[INFO] Scraping tool page: {card['detail_url']}")
+            html = fetch_detail(card["detail_url"])
+            if save_dir:
+                with open(os.path.join(save_dir, "tools", _slug(card["detail_url"]) + ".html"), "w", encoding="utf-8") as f:
+                    f.write(html)
+            redirect_url, full_description = parse_detail(html)
+            return card, redirect_url, full_description
         except Exception as e:
-            print(f"[ERROR] Skipping a tool due to an error: {e}")
-            continue
+            print(f"[ERROR] Skipping {card['name'] or card['detail_url']} due to an error: {e}")
+            return None
 
-    driver.quit()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        details = [detail for detail in executor.map(collect, cards) if detail is not None]
+
+    # Follow the redirects to get the actual AI tool URLs
+    final_urls = resolve([redirect_url for _, redirect_url, _ in details]) if resolve else {}
+    tools = [
+        (card["name"], card["short_description"], full_description or card["short_description"],
+         card["category"], "FutureTools.io", final_urls.get(redirect_url, redirect_url))
+        for card, redirect_url, full_description in details
+    ]
 
     # Print extracted tools
     print("Extracted Tools:")
@@ -146,24 +186,62 @@ def scrape_futuretools():
     return tools
 
 
+def fixture_reader(fixture_dir):
+    """
+    Return a fetch_detail that reads tool pages saved by ``--save`` from
+    ``fixture_dir/tools/<slug>.html``.
+    """
+    def read(detail_url):
+        with open(os.path.join(fixture_dir, "tools", _slug(detail_url) + ".html"), encoding="utf-8") as f:
+            return f.read()
+    return read
+
+
+# Columns of each scraped tool tuple, in order
+TOOL_COLUMNS = ("name", "short_description", "full_description", "category", "source", "source_url")
+
+
 # Function to store data in PostgreSQL
 def store_data(tools):
     conn = connect_db()
-    cur = conn.cursor()
+    try:
+        inserted, skipped = write_tools(conn, TOOL_COLUMNS, tools)
+    finally:
+        conn.close()
+    return inserted, skipped
 
-    for tool in tools:
-        cur.execute(
-            "INSERT INTO ai_tools (name, short_description, full_description, category, source, source_url) VALUES (%s, %s, %s, %s, %s, %s) ON CONFLICT (source_url) DO NOTHING",
-            tool
-        )
 
-    conn.commit()
-    cur.close()
-    conn.close()
+def scrape(source):
+    """
+    Entry point for Scrapers/orchestrator.py (``source`` carries its limits).
+
+    Returns:
+        tuple: (TOOL_COLUMNS, tools)
+    """
+    return TOOL_COLUMNS, scrape_futuretools(workers=source.concurrency or FUTURETOOLS_WORKERS,
+                                            fetch_detail=source.polite(fetch_detail_html))
 
 
 if __name__ == "__main__":
-    create_table()
-    tools = scrape_futuretools()
-    store_data(tools)
-    print(f"Scraped and stored {len(tools)} AI tools from FutureTools.io Newly Added!")
+    parser = argparse.ArgumentParser(description="Scrape FutureTools.io Newly Added into ai_tools")
+    parser.add_argument("--depth", type=int, default=FUTURETOOLS_DEPTH or 0,
+                        help="tools to collect from the top of the listing (0 = all)")
+    parser.add_argument("--workers", type=int, default=FUTURETOOLS_WORKERS, help="tool pages fetched in parallel")
+    parser.add_argument("--save", metavar="DIR", help="also save the listing and tool pages as fixtures")
+    parser.add_argument("--fixtures", metavar="DIR",
+                        help="parse pages saved with --save instead of the live site (prints, stores nothing)")
+    args = parser.parse_args()
+    depth = args.depth or None
+
+    if args.fixtures:
+        with open(os.path.join(args.fixtures, "listing.html"), encoding="utf-8") as f:
+            listing_html = f.read()
+        tools = scrape_futuretools(depth, args.workers, listing_html=listing_html,
+                                   fetch_detail=fixture_reader(args.fixtures), resolve=None)
+        print(f"Parsed {len(tools)} AI tools from fixtures in {args.fixtures}")
+    else:
+        run_migrations()
+        tools = scrape_futuretools(depth, args.workers, save_dir=args.save)
+        inserted, skipped = store_data(tools)
+        print(f"Scraped {len(tools)} AI tools from FutureTools.io Newly Added: stored {inserted} new, skipped {skipped} already known")
+        print(f"[INFO] Redirects: {get_resolver().stats()}")
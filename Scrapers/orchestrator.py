@@ -0,0 +1,345 @@
+"""
+Run every registered scraper source concurrently from one entry point.
+
+    python Scrapers/orchestrator.py                      # scrape all sources
+    python Scrapers/orchestrator.py --sources Toolify.ai
+    python Scrapers/orchestrator.py --list
+
+Each source scrape is a row in the scrape_jobs table (migration 7). A run
+queues one job per selected source that isn't already queued, then drains
+the queue: due jobs are claimed with FOR UPDATE SKIP LOCKED and run in
+parallel, so the run takes about as long as the slowest source. A failed
+job is retried with exponential backoff up to its max_attempts. A job left
+running by a crashed orchestrator keeps its row, and once its lease
+expires the next run picks it up again.
+
+Scrape threads fetch and parse. The only database access they have is
+redirect_cache, which they read and fill through the shared connection
+pool (Scrapers/redirect_resolver.py). The orchestrator thread is the only
+writer of ai_tools and scrape_jobs. It stores each finished job's tools with
+tool_writer.write_tools (batched multi-row INSERTs) before marking the job
+done. write_tools skips known tools, so a job re-run after a crash between
+the two stores nothing twice.
+"""
+import argparse
+import importlib
+import os
+import socket
+import sys
+import time
+import urllib.parse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables (before importing modules that read settings)
+load_dotenv()
+
+# Make the project root importable when run as a script (python Scrapers/...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.db_pool import db_config
+from backend.http_client import RateLimiter
+from backend.schema import run_migrations
+from backend.tool_writer import write_tools
+
+# Attempts per job before it is marked failed
+SCRAPE_MAX_ATTEMPTS = int(os.getenv("SCRAPE_MAX_ATTEMPTS", "3"))
+# Seconds before the first retry of a failed job; doubles per attempt
+SCRAPE_RETRY_DELAY = float(os.getenv("SCRAPE_RETRY_DELAY", "30"))
+# Seconds a claimed job stays reserved without a heartbeat
+SCRAPE_LEASE = int(os.getenv("SCRAPE_LEASE", "300"))
+# Sources scraped at the same time (0 = all of them)
+SCRAPE_WORKERS = int(os.getenv("SCRAPE_WORKERS", "0"))
+
+
+class Source:
+    """
+    A scraper plugin.
+
+    ``scrape`` is "module:function", imported on first use, and is called
+    as ``function(source)``. It returns ``(columns, tools)``, the tool tuples
+    and the ai_tools columns they fill.
+
+    Args:
+        name (str): Source name, as stored in ai_tools.source
+        scrape (str): "module:function" of the adapter
+        concurrency (int or None): Requests the scraper may have in flight against
+            the source (None: the scraper's own default)
+        min_interval (float): Minimum seconds between requests to the source (politeness)
+    """
+
+    def __init__(self, name, scrape, concurrency=None, min_interval=0.0):
+        self.name = name
+        self.scrape = scrape
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self._limiter = RateLimiter(1 / min_interval) if min_interval else None
+
+    def polite(self, fetch):
+        """
+        Wrap a url -> response callable so calls respect ``min_interval``.
+        """
+        if self._limiter is None:
+            return fetch
+
+        def polite_fetch(url, *args, **kwargs):
+            self._limiter.acquire(urllib.parse.urlsplit(url).netloc)
+            return fetch(url, *args, **kwargs)
+        return polite_fetch
+
+    def run(self):
+        module_name, function_name = self.scrape.split(":")
+        return getattr(importlib.import_module(module_name), function_name)(self)
+
+
+SOURCES = {}
+
+
+def register_source(name, scrape, concurrency=None, min_interval=0.0):
+    SOURCES[name] = Source(name, scrape, concurrency, min_interval)
+    return SOURCES[name]
+
+
+register_source(
+    "FutureTools.io", "Scrapers.futuretools_scraper:scrape",
+    min_interval=float(os.getenv("FUTURETOOLS_MIN_INTERVAL", "0.25")),
+)
+register_source("Toolify.ai", "Scrapers.toolify_scraper:scrape")
+
+
+class JobQueue:
+    """
+    scrape_jobs access for one orchestrator (``worker`` = host:pid).
+    Every method commits.
+    """
+
+    def __init__(self, conn, worker, lease=SCRAPE_LEASE):
+        self.conn = conn
+        self.worker = worker
+        self.lease = lease
+
+    def _execute(self, query, params=()):
+        cur = self.conn.cursor()
+        try:
+            cur.execute(query, params)
+            rows = cur.fetchall() if cur.description else []
+            self.conn.commit()
+            return rows
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+    def enqueue(self, sources, max_attempts=SCRAPE_MAX_ATTEMPTS):
+        """
+        Queue a job for each source without a pending or running one.
+
+        Returns:
+            list: Sources queued by this call
+        """
+        rows = self._execute(
+            """
+            INSERT INTO scrape_jobs (source, max_attempts)
+            SELECT unnest(%s::text[]), %s
+            ON CONFLICT (source) WHERE status IN ('pending', 'running') DO NOTHING
+            RETURNING source
+            """,
+            (list(sources), max_attempts),
+        )
+        return [row[0] for row in rows]
+
+    def reclaim_expired(self):
+        """
+        Return running jobs whose lease ran out (their orchestrator died) to the queue.
+
+        Returns:
+            list: Sources of the reclaimed jobs
+        """
+        rows = self._execute(
+            """
+            UPDATE scrape_jobs SET status = 'pending', locked_by = NULL, locked_until = NULL,
+                last_error = coalesce(last_error, 'lease expired')
+            WHERE status = 'running' AND locked_until < NOW()
+            RETURNING source
+            """
+        )
+        return [row[0] for row in rows]
+
+    def claim(self, sources):
+        """
+        Claim the next due job of one of ``sources``.
+
+        Returns:
+            tuple or None: (id, source, attempts) of the claimed job
+        """
+        if not sources:
+            return None
+        rows = self._execute(
+            """
+            UPDATE scrape_jobs SET status = 'running', attempts = attempts + 1, locked_by = %s,
+                locked_until = NOW() + make_interval(secs => %s), started_at = NOW()
+            WHERE id = (
+                SELECT id FROM scrape_jobs
+                WHERE status = 'pending' AND run_after <= NOW() AND source = ANY(%s)
+                ORDER BY run_after, id LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, source, attempts
+            """,
+            (self.worker, self.lease, list(sources)),
+        )
+        return rows[0] if rows else None
+
+    def heartbeat(self, job_ids):
+        if job_ids:
+            self._execute(
+                """
+                UPDATE scrape_jobs SET locked_until = NOW() + make_interval(secs => %s)
+                WHERE id = ANY(%s) AND locked_by = %s AND status = 'running'
+                """,
+                (self.lease, list(job_ids), self.worker),
+            )
+
+    def finish(self, job_id, scraped, inserted):
+        self._execute(
+            """
+            UPDATE scrape_jobs SET status = 'done', scraped = %s, inserted = %s, last_error = NULL,
+                locked_by = NULL, locked_until = NULL, finished_at = NOW()
+            WHERE id = %s
+            """,
+            (scraped, inserted, job_id),
+        )
+
+    def fail(self, job_id, error, retry_delay=SCRAPE_RETRY_DELAY):
+        """
+        Record a failed attempt: back to pending after an exponential delay,
+        or failed for good once max_attempts is used up.
+
+        Returns:
+            str: The job's new status
+        """
+        rows = self._execute(
+            """
+            UPDATE scrape_jobs SET
+                status = CASE WHEN attempts < max_attempts THEN 'pending' ELSE 'failed' END,
+                run_after = NOW() + make_interval(secs => %s * 2 ^ (attempts - 1)),
+                finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE NOW() END,
+                last_error = %s, locked_by = NULL, locked_until = NULL
+            WHERE id = %s
+            RETURNING status
+            """,
+            (retry_delay, str(error)[:1000], job_id),
+        )
+        return rows[0][0] if rows else None
+
+    def next_due(self, sources):
+        """
+        Returns:
+            float or None: Seconds until the next pending job of ``sources`` is due
+            (0 if one is due now), or None if none are pending
+        """
+        rows = self._execute(
+            """
+            SELECT extract(epoch FROM min(run_after) - NOW()) FROM scrape_jobs
+            WHERE status = 'pending' AND source = ANY(%s)
+            """,
+            (list(sources),),
+        )
+        due = rows[0][0]
+        return None if due is None else max(0.0, float(due))
+
+
+def run(source_names=None, workers=SCRAPE_WORKERS, enqueue=True):
+    """
+    Queue and drain scrape jobs for ``source_names`` (default: every registered source).
+
+    Returns:
+        dict: source -> (status, scraped, inserted) for each job this run finished
+    """
+    names = list(source_names or SOURCES)
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown sources: {', '.join(unknown)} (registered: {', '.join(SOURCES)})")
+
+    conn = psycopg2.connect(**db_config())
+    queue = JobQueue(conn, f"{socket.gethostname()}:{os.getpid()}")
+    outcomes = {}
+    try:
+        reclaimed = queue.reclaim_expired()
+        if reclaimed:
+            print(f"[INFO] Resuming jobs left running by a crashed run: {', '.join(reclaimed)}")
+        if enqueue:
+            queued = queue.enqueue(names)
+            print(f"[INFO] Queued: {', '.join(queued) or 'nothing new'}")
+
+        running = {}  # future -> (job_id, source)
+        heartbeat_every = max(1.0, queue.lease / 3)
+        with ThreadPoolExecutor(max_workers=max(1, workers or len(names))) as executor:
+            while True:
+                # One job per source at a time (the active-source unique index)
+                busy = {source for _, source in running.values()}
+                while len(running) < (workers or len(names)):
+                    job = queue.claim([name for name in names if name not in busy])
+                    if job is None:
+                        break
+                    job_id, source, attempt = job
+                    print(f"[INFO] Scraping {source} (job {job_id}, attempt {attempt})")
+                    running[executor.submit(SOURCES[source].run)] = (job_id, source)
+                    busy.add(source)
+
+                if not running:
+                    due = queue.next_due(names)
+                    if due is None:
+                        break
+                    time.sleep(min(due, heartbeat_every) or 0.1)
+                    continue
+
+                done, _ = wait(running, timeout=heartbeat_every, return_when=FIRST_COMPLETED)
+                queue.heartbeat([job_id for future, (job_id, _) in running.items() if future not in done])
+
+                for future in done:
+                    job_id, source = running.pop(future)
+                    try:
+                        columns, tools = future.result()
+                        if not tools:
+                            raise RuntimeError("scraper returned no tools")
+                        # The only ai_tools writer (scrape threads only touch redirect_cache)
+                        inserted, _ = write_tools(conn, columns, tools)
+                    except Exception as e:
+                        status = queue.fail(job_id, e)
+                        print(f"❌ {source} failed ({status}): {e}", file=sys.stderr, flush=True)
+                        if status == "failed":
+                            outcomes[source] = ("failed", 0, 0)
+                        continue
+                    queue.finish(job_id, len(tools), inserted)
+                    outcomes[source] = ("done", len(tools), inserted)
+                    print(f"[INFO] {source}: scraped {len(tools)}, stored {inserted} new")
+    finally:
+        conn.close()
+    return outcomes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape all registered sources into ai_tools")
+    parser.add_argument("--sources", nargs="+", metavar="NAME", help="sources to scrape (default: all)")
+    parser.add_argument("--workers", type=int, default=SCRAPE_WORKERS,
+                        help="sources scraped at the same time (0 = all)")
+    parser.add_argument("--resume", action="store_true",
+                        help="only drain jobs already queued, don't queue new ones")
+    parser.add_argument("--list", action="store_true", help="list registered sources and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for source in SOURCES.values():
+            print(f"{source.name}: concurrency {source.concurrency or 'default'}, min interval {source.min_interval}s")
+        sys.exit(0)
+
+    run_migrations()
+    started = time.perf_counter()
+    outcomes = run(args.sources, args.workers, enqueue=not args.resume)
+    for name, (status, scraped, inserted) in outcomes.items():
+        print(f"{name}: {status}, scraped {scraped}, stored {inserted} new")
+    print(f"[INFO] Finished in {time.perf_counter() - started:.1f}s")
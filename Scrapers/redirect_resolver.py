@@ -0,0 +1,222 @@
+"""
+Resolve scraped outbound links (directory redirect URLs) to the tool sites
+they end up at, concurrently and cached in the database.
+
+Each link is resolved with a HEAD request that follows redirects. If the
+server refuses HEAD, a streaming GET is sent and closed as soon as the
+headers arrive, so no landing page is downloaded. Resolutions run in
+parallel (REDIRECT_WORKERS), with at most REDIRECT_PER_HOST in flight per
+host.
+
+Results are kept in redirect_cache (migration 8) for REDIRECT_TTL seconds.
+Failures, including links whose final answer is an HTTP error (429, 5xx,
+...), are cached too, for REDIRECT_NEGATIVE_TTL seconds. A rescrape
+therefore only sends requests for links it hasn't seen recently.
+"""
+import os
+import sys
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from psycopg2.extras import execute_values
+
+from backend.db_pool import pooled_connection
+from backend.http_client import get_client
+
+REDIRECT_WORKERS = int(os.getenv("REDIRECT_WORKERS", "16"))
+# Concurrent resolutions against any one host
+REDIRECT_PER_HOST = int(os.getenv("REDIRECT_PER_HOST", "4"))
+# Seconds a resolved link (and a failed one) is reused before resolving it again
+REDIRECT_TTL = int(os.getenv("REDIRECT_TTL", str(30 * 24 * 3600)))
+REDIRECT_NEGATIVE_TTL = int(os.getenv("REDIRECT_NEGATIVE_TTL", str(6 * 3600)))
+REDIRECT_TIMEOUT = (5, 10)  # (connect, read) seconds
+
+# HEAD answers that say nothing about where a GET would land
+HEAD_FALLBACK_STATUSES = (400, 403, 404, 405, 501)
+
+
+class RedirectResolver:
+    """
+    Resolves links to their final URL, consulting and filling redirect_cache.
+
+    Args:
+        workers (int): Resolutions in flight at once
+        per_host (int): Resolutions in flight per host
+        use_cache (bool): False skips redirect_cache (e.g. without a database)
+    """
+
+    def __init__(self, workers=REDIRECT_WORKERS, per_host=REDIRECT_PER_HOST, ttl=REDIRECT_TTL,
+                 negative_ttl=REDIRECT_NEGATIVE_TTL, use_cache=True):
+        self.workers = workers
+        self.per_host = per_host
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.use_cache = use_cache
+
+        self._lock = threading.Lock()
+        self._hosts = {}  # host -> BoundedSemaphore
+
+        self._hits = 0
+        self._negative_hits = 0
+        self._resolved = 0
+        self._failed = 0
+        self._get_fallbacks = 0
+
+    def _host_slot(self, url):
+        host = urllib.parse.urlsplit(url).netloc
+        with self._lock:
+            slot = self._hosts.get(host)
+            if slot is None:
+                slot = self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def resolve_one(self, url):
+        """
+        Follow ``url``'s redirects without downloading the final page.
+
+        Returns:
+            tuple: (final_url, status, error); final_url is None on failure,
+            including a final answer of 400 or above (rate limits and server
+            errors say nothing about where the link leads)
+        """
+        client = get_client()
+        try:
+            with self._host_slot(url):
+                response = client.head(url, allow_redirects=True, timeout=REDIRECT_TIMEOUT)
+                response.close()
+                if response.status_code in HEAD_FALLBACK_STATUSES:
+                    # stream=True returns after the headers; closing drops the body unread
+                    response = client.get(url, allow_redirects=True, stream=True, timeout=REDIRECT_TIMEOUT)
+                    response.close()
+                    with self._lock:
+                        self._get_fallbacks += 1
+        except requests.exceptions.RequestException as e:
+            with self._lock:
+                self._failed += 1
+            return None, None, str(e)[:500]
+        if response.status_code >= 400:
+            with self._lock:
+                self._failed += 1
+            return None, response.status_code, f"HTTP {response.status_code} from {response.url}"[:500]
+        with self._lock:
+            self._resolved += 1
+        return response.url, response.status_code, None
+
+    def _cached(self, urls):
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT url, final_url, error FROM redirect_cache WHERE url = ANY(%s) AND expires_at > NOW()",
+                (urls,),
+            )
+            rows = cur.fetchall()
+            conn.rollback()
+            cur.close()
+        return {url: (final_url, error) for url, final_url, error in rows}
+
+    def _store(self, results):
+        rows = [
+            (url, final_url, status, error, self.ttl if final_url is not None else self.negative_ttl)
+            for url, (final_url, status, error) in results.items()
+        ]
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                execute_values(
+                    cur,
+                    """
+                    INSERT INTO redirect_cache (url, final_url, status, error, expires_at)
+                    SELECT v.url, v.final_url, v.status, v.error, NOW() + make_interval(secs => v.ttl)
+                    FROM (VALUES %s) AS v (url, final_url, status, error, ttl)
+                    ON CONFLICT (url) DO UPDATE SET final_url = EXCLUDED.final_url, status = EXCLUDED.status,
+                        error = EXCLUDED.error, resolved_at = NOW(), expires_at = EXCLUDED.expires_at
+                    """,
+                    rows,
+                    template="(%s, %s, %s::integer, %s, %s::integer)",
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+    def resolve_many(self, urls):
+        """
+        Resolve every link, from the cache where possible.
+
+        Args:
+            urls (iterable): Links to resolve (duplicates and blanks are ignored)
+
+        Returns:
+            dict: url -> final URL; links that failed (now or in a cached
+            failure) are left out, so callers can fall back to the link itself
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if not urls:
+            return {}
+
+        final = {}
+        cached = {}
+        if self.use_cache:
+            try:
+                cached = self._cached(urls)
+            except Exception as e:
+                print("❌ Redirect cache lookup failed:", str(e), file=sys.stderr, flush=True)
+        for url, (final_url, _) in cached.items():
+            if final_url is not None:
+                final[url] = final_url
+        with self._lock:
+            self._hits += len(final)
+            self._negative_hits += len(cached) - len(final)
+
+        missing = [url for url in urls if url not in cached]
+        if not missing:
+            return final
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(missing)))) as executor:
+            results = dict(zip(missing, executor.map(self.resolve_one, missing)))
+        for url, (final_url, _, error) in results.items():
+            if final_url is not None:
+                final[url] = final_url
+            else:
+                print(f"[ERROR] Failed to follow redirect for {url}: {error}")
+
+        if self.use_cache:
+            try:
+                self._store(results)
+            except Exception as e:
+                print("❌ Redirect cache update failed:", str(e), file=sys.stderr, flush=True)
+        return final
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cache_hits": self._hits,
+                "cached_failures": self._negative_hits,
+                "resolved": self._resolved,
+                "failed": self._failed,
+                "get_fallbacks": self._get_fallbacks,
+                "hosts": len(self._hosts),
+            }
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver():
+    """
+    Return the process-wide resolver, creating it on first use.
+    """
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = RedirectResolver()
+        return _resolver
+
+
+def resolve_redirects(urls):
+    return get_resolver().resolve_many(urls)
@@ -1,15 +1,15 @@
-import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 import psycopg2
 import os
+import sys
+import urllib.parse
 from dotenv import load_dotenv
-import time
+
+# Make the project root importable when run as a script (python Scrapers/...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.schema import run_migrations
+from backend.tool_writer import write_tools
+from Scrapers.fetch_strategy import FetchError, fetch_stats, get_strategy
 
 # Load environment variables
 load_dotenv()
@@ -29,77 +29,40 @@ def connect_db():
     return psycopg2.connect(**DB_CONFIG)
 
 
-# Function to create table if it doesn't exist
-def create_table():
-    conn = connect_db()
-    cur = conn.cursor()
-    cur.execute('''
-        CREATE TABLE IF NOT EXISTS ai_tools (
-            id SERIAL PRIMARY KEY,
-            name TEXT,
-            short_description TEXT,
-            source TEXT,
-            source_url TEXT UNIQUE
-        )
-    ''')
-    conn.commit()
-    cur.close()
-    conn.close()
+TOOLIFY_URL = "https://www.toolify.ai/new"
 
+# Selectors a Toolify page needs before it's worth parsing
+REQUIRED_SELECTORS = (".tool-item", ".tool-item .go-tool-detail-name")
 
-# Function to scrape Toolify.ai New Tools page
-def scrape_toolify():
-    url = "https://www.toolify.ai/new"
 
-    # Set up Selenium WebDriver
-    chrome_options = Options()
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")  # Avoid detection
-    chrome_options.add_argument("--headless")  # Run in headless mode for efficiency
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+def parse_tools(soup, page_url=TOOLIFY_URL):
+    """
+    Extract tools from a Toolify.ai listing page.
 
-    print("[INFO] Opening Toolify.ai New Tools page in Chrome...")
-    driver.get(url)
+    Args:
+        soup (BeautifulSoup): Parsed page (server HTML or browser page source)
+        page_url (str): URL the page came from, for relative links
 
+    Returns:
+        list: (name, short_description, source, source_url) tuples
+    """
     tools = []
-
-    try:
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "tool-item"))
-        )
-        print("[INFO] AI tools have loaded.")
-    except Exception as e:
-        print("[ERROR] Timeout waiting for AI tool elements:", e)
-        driver.quit()
-        return []
-
-    # Find all tool elements
-    tool_cards = driver.find_elements(By.CLASS_NAME, "tool-item")
-
-    for card in tool_cards:
+    for card in soup.select(".tool-item"):
         try:
             # Extract tool name
-            name_element = card.find_element(By.CLASS_NAME, "go-tool-detail-name")
-            name = name_element.text.strip()
+            name = card.select_one(".go-tool-detail-name").get_text().strip()
 
             # Extract short description
-            short_description_element = card.find_element(By.CLASS_NAME, "tool-desc")
-            short_description = short_description_element.text.strip()
+            short_description_element = card.select_one(".tool-desc")
+            short_description = short_description_element.get_text().strip() if short_description_element else ""
 
             # Extract the actual AI tool URL (ensuring it is NOT a Toolify.ai URL)
             actual_tool_url = ""
-
-            try:
-                # First attempt: Extract external URLs, skipping any Toolify.ai links
-                tool_links = card.find_elements(By.XPATH, './/a[@rel="dofollow" and @target="_blank"]')
-
-                for link in tool_links:
-                    url = link.get_attribute("href")
-                    if "toolify.ai" not in url:  # Ensure it's NOT a Toolify.ai internal link
-                        actual_tool_url = url
-                        break  # Stop searching once we find a valid external link
-
-            except:
-                actual_tool_url = ""  # If no valid link is found, leave it empty
+            for link in card.select('a[rel~="dofollow"][target="_blank"][href]'):
+                url = urllib.parse.urljoin(page_url, link["href"])
+                if "toolify.ai" not in url:  # Ensure it's NOT a Toolify.ai internal link
+                    actual_tool_url = url
+                    break  # Stop searching once we find a valid external link
 
             # Append extracted data
             tools.append((name, short_description, "Toolify.ai", actual_tool_url))
@@ -107,8 +70,25 @@ def scrape_toolify():
         except Exception as e:
             print(f"[ERROR] Skipping a tool due to an error: {e}")
             continue
+    return tools
+
+
+# Function to scrape Toolify.ai New Tools page
+def scrape_toolify(url=TOOLIFY_URL):
+    """
+    Scrape Toolify.ai "New" over plain HTTP, falling back to a pooled
+    headless browser only when the server HTML lacks the tool cards.
+    """
+    strategy = get_strategy("Toolify.ai", REQUIRED_SELECTORS)
+    print("[INFO] Fetching Toolify.ai New Tools page...")
+    try:
+        page = strategy.fetch(url)
+    except FetchError as e:
+        print("[ERROR] Could not load AI tool elements:", e)
+        return []
+    print(f"[INFO] AI tools have loaded (via {page.path}).")
 
-    driver.quit()
+    tools = parse_tools(page.soup, url)
 
     # Print extracted tools
     print("[INFO] Extracted Tools:")
@@ -118,24 +98,34 @@ def scrape_toolify():
     return tools
 
 
+# Columns of each scraped tool tuple, in order
+TOOL_COLUMNS = ("name", "short_description", "source", "source_url")
+
+
 # Function to store data in PostgreSQL
 def store_data(tools):
     conn = connect_db()
-    cur = conn.cursor()
+    try:
+        inserted, skipped = write_tools(conn, TOOL_COLUMNS, tools)
+    finally:
+        conn.close()
+    return inserted, skipped
 
-    for tool in tools:
-        cur.execute(
-            "INSERT INTO ai_tools (name, short_description, source, source_url) VALUES (%s, %s, %s, %s) ON CONFLICT (source_url) DO NOTHING",
-            tool
-        )
 
-    conn.commit()
-    cur.close()
-    conn.close()
+
+def scrape(source):
+    """
+    Entry point for Scrapers/orchestrator.py (``source`` carries its limits).
+
+    Returns:
+        tuple: (TOOL_COLUMNS, tools)
+    """
+    return TOOL_COLUMNS, scrape_toolify()
 
 
 if __name__ == "__main__":
-    create_table()
+    run_migrations()
     tools = scrape_toolify()
-    store_data(tools)
-    print(f"[INFO] Scraped and stored {len(tools)} AI tools from Toolify.ai New Tools!")
+    inserted, skipped = store_data(tools)
+    print(f"[INFO] Scraped {len(tools)} AI tools from Toolify.ai New Tools: stored {inserted} new, skipped {skipped} already known")
+    print(f"[INFO] Fetch paths: {fetch_stats()}")
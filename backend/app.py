@@ -1,130 +1,199 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, jsonify, request
 from flask_cors import CORS
-import psycopg2
 import os
-import requests
 import sys
 from datetime import datetime
 
+# Make the project root importable when run directly (python backend/app.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.catalog_snapshot import CatalogCache
+from backend.db_pool import PoolTimeout, pool_stats, pooled_connection
+from backend.http_client import http_stats
+from backend.response_cache import ResponseCache
+from backend.schema import run_migrations
+from backend.static_files import screenshot_index, screenshots_bp
+from backend.response_encoding import EncodedBody, encoded_json_response
+from backend.tool_queries import (
+    DEFAULT_SEARCH_LIMIT,
+    InvalidQuery,
+    fetch_tools,
+    parse_fields,
+    parse_limit,
+    parse_search_query,
+    search_page,
+    search_query,
+    tool_to_dict,
+)
+from backend.trends import TrendsCache
+
 app = Flask(__name__)
 CORS(app)  # Allow requests from Next.js frontend
+# Screenshots (/static/screenshots/...): indexed, conditional and range-aware, see backend/static_files.py
+app.register_blueprint(screenshots_bp)
 
+# Bring the schema up to date before serving (serialized by an advisory lock across workers)
+# A failure stops the worker from booting rather than serving against an old schema
+try:
+    run_migrations()
+except Exception as e:
+    print("❌ Schema migration failed:", str(e), file=sys.stderr, flush=True)
+    raise
+
+
+# The whole catalog in memory, reloaded when a writer bumps the catalog version
+# (see backend/catalog_snapshot.py)
+catalog = CatalogCache(dumps=app.json.dumps)
+
+# Paginated /api/tools responses, dropped whenever the catalog snapshot changes
+tools_cache = ResponseCache(
+    maxsize=int(os.getenv("TOOLS_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("TOOLS_CACHE_TTL", "300")),
+)
 
-# PostgreSQL Database Connection
-def get_db_connection():
-    return psycopg2.connect(
-        dbname=os.getenv("DB_NAME"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        host=os.getenv("DB_HOST"),
-        port=os.getenv("DB_PORT"),
-    )
+
+# Pool exhausted: shed load instead of queueing requests indefinitely
+@app.errorhandler(PoolTimeout)
+def handle_pool_timeout(e):
+    print("❌ Database pool exhausted:", str(e), file=sys.stderr, flush=True)
+    response = jsonify({"error": "Database busy, please retry"})
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
 
 
 # API Route: Get AI Tools with Source and Type Filtering
 @app.route('/api/tools', methods=['GET'])
 def get_ai_tools():
-    conn = get_db_connection()
-    cur = conn.cursor()
-
     source_filter = request.args.get("source")
     type_filter = request.args.get("filter", "new")  # Default to 'new' if not specified
+    limit_param = request.args.get("limit")
+    after = request.args.get("after")
+    fields_param = request.args.get("fields")
 
-    if source_filter:
-        # First, try to get top tools for the specific source
-        cur.execute(
-            """
-            SELECT name, short_description, full_description, category, 
-                   source, source_url, screenshot_url, type 
-            FROM ai_tools 
-            WHERE source = %s AND type = %s;
-            """,
-            (source_filter, type_filter)
-        )
-
-        tools = cur.fetchall()
-
-        # If no tools found for this source and type, then get top tools across all sources
-        if not tools and type_filter == 'top':
-            cur.execute(
-                """
-                SELECT name, short_description, full_description, category, 
-                       source, source_url, screenshot_url, type 
-                FROM ai_tools 
-                WHERE type = %s;
-                """,
-                (type_filter,)
-            )
-            tools = cur.fetchall()
+    # Only paginated requests get the {"tools": [...], "next_cursor": ...} envelope
+    paginated = bool(limit_param or after)
+
+    try:
+        fields = parse_fields(fields_param)
+        limit = parse_limit(limit_param)
+    except InvalidQuery as e:
+        return jsonify({"error": str(e)}), 400
+
+    snapshot = catalog.get()
+    if snapshot is not None:
+        if not paginated:
+            # The common case: a pre-serialized body straight from memory
+            encoded = snapshot.body(type_filter, source_filter, fields, request.host_url, app.json.dumps)
+            return _encoded_json_response(encoded)
+        tools_cache.observe_version(snapshot.version)
+
+    cache_key = (source_filter, type_filter, request.host_url, limit_param, after, fields_param)
+    encoded = tools_cache.get(cache_key) if snapshot is not None else None
+    if encoded is not None:
+        return _encoded_json_response(encoded)
+
+    try:
+        if snapshot is not None:
+            rows, next_cursor, fell_back = snapshot.page(type_filter, source_filter, fields, limit=limit, after=after)
+        else:
+            # No snapshot yet (database was unreachable): query directly, don't cache
+            with pooled_connection() as conn:
+                cur = conn.cursor()
+                rows, next_cursor, fell_back = fetch_tools(
+                    cur, source_filter, type_filter, fields, limit=limit, after=after
+                )
+                cur.close()
+    except InvalidQuery as e:
+        return jsonify({"error": str(e)}), 400
+
+    tools = [tool_to_dict(row, fields, request.host_url) for row in rows]
+    if paginated:
+        payload = {"tools": tools, "next_cursor": next_cursor, "fell_back": fell_back}
     else:
-        # If no source is specified, just fetch by type
-        cur.execute(
-            """
-            SELECT name, short_description, full_description, category, 
-                   source, source_url, screenshot_url, type 
-            FROM ai_tools 
-            WHERE type = %s;
-            """,
-            (type_filter,)
-        )
-        tools = cur.fetchall()
-
-    cur.close()
-    conn.close()
-
-    return jsonify([
-        {
-            "name": tool[0],
-            "short_description": tool[1],
-            "full_description": tool[2],
-            "category": tool[3],
-            "source": tool[4],
-            "source_url": tool[5],
-            "screenshot_url": f"{request.host_url.rstrip('/')}/static/screenshots/{tool[6].replace('/static/screenshots/', '')}" if tool[6] else "/default-screenshot.png",
-            "type": tool[7]
-        }
-        for tool in tools
-    ])
-
-# Serve screenshots
-@app.route('/static/screenshots/<path:filename>')
-def serve_screenshot(filename):
-    return send_from_directory("static/screenshots", filename)
-
-
-# Fetch ALL Google Trends Data from SerpAPI
-def get_all_trending_topics():
+        payload = tools
+
+    encoded = EncodedBody(
+        (app.json.dumps(payload) + "\n").encode("utf-8"),
+        # Tells the client the source had no tools and top tools from all sources were returned
+        headers={"X-Source-Fallback": "true" if fell_back else "false"},
+    )
+    if snapshot is not None:
+        tools_cache.set(cache_key, encoded)
+    return _encoded_json_response(encoded)
+
+
+def _encoded_json_response(encoded):
+    return encoded_json_response(app.response_class, encoded, request.headers)
+
+
+# API Route: Ranked full-text search over names, descriptions and categories
+@app.route('/api/tools/search', methods=['GET'])
+def search_ai_tools():
+    limit_param = request.args.get("limit")
+    after = request.args.get("after")
+    fields_param = request.args.get("fields")
+
     try:
-        api_key = os.getenv("SERPAPI_KEY")  # Load SerpAPI key from .env
-        params = {
-            "engine": "google_trends",
-            "trend_type": "daily",
-            "geo": "US",
-            "api_key": api_key,
-        }
-        response = requests.get("https://serpapi.com/search", params=params)
-        data = response.json()
+        tsquery = parse_search_query(request.args.get("q"))
+        fields = parse_fields(fields_param)
+        limit = parse_limit(limit_param) or DEFAULT_SEARCH_LIMIT
+        query, params = search_query(tsquery, fields, limit, after)
+    except InvalidQuery as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Type-ahead repeats the same prefixes; results live as long as the catalog snapshot
+    snapshot = catalog.get()
+    if snapshot is not None:
+        tools_cache.observe_version(snapshot.version)
+    cache_key = ("search", tsquery, request.host_url, limit, after, fields_param)
+    encoded = tools_cache.get(cache_key) if snapshot is not None else None
+    if encoded is not None:
+        return _encoded_json_response(encoded)
+
+    with pooled_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(query, params)
+        rows, next_cursor, truncated = search_page(cur.fetchall(), limit)
+        cur.close()
 
-        # Debug: Print full response to check what SerpAPI returns
-        print("SerpAPI Full Response:", data)
+    tools = [tool_to_dict(row, fields, request.host_url) for row in rows]
+    encoded = EncodedBody((app.json.dumps({"tools": tools, "next_cursor": next_cursor, "truncated": truncated}) + "\n").encode("utf-8"))
+    if snapshot is not None:
+        tools_cache.set(cache_key, encoded)
+    return _encoded_json_response(encoded)
 
-        if "trending_searches" not in data:
-            return ["No trends found"]
 
-        # Extract top trending searches (no AI filter)
-        all_trends = [trend["title"] for trend in data["trending_searches"]]
+# Google Trends from SerpAPI, refreshed in the background (see backend/trends.py)
+trends_cache = TrendsCache()
 
-        return all_trends[:5]  # Return top 5 trending topics
 
-    except Exception as e:
-        return [f"Error fetching trends: {str(e)}"]
+def get_all_trending_topics():
+    trends, _, error = trends_cache.get()
+    if trends is None:
+        return [f"Error fetching trends: {error}"]
+    return trends
 
 
 # New API Route to Fetch All Trends
 @app.route('/api/trends/test', methods=['GET'])
 def test_google_trends():
-    trends = get_all_trending_topics()
-    return jsonify(trends)
+    trends, age, error = trends_cache.get()
+    if trends is None:
+        response = jsonify([f"Error fetching trends: {error}"])
+        response.headers["Cache-Control"] = "no-store"
+        return response
+
+    response = jsonify(trends)
+    response.headers["Age"] = str(int(age))
+    # Let browsers/CDNs apply the same freshness and stale-while-revalidate windows
+    fresh_for = max(0, int(trends_cache.refresh_interval - age))
+    response.headers["Cache-Control"] = (
+        f"public, max-age={fresh_for}, stale-while-revalidate={int(trends_cache.stale_while_revalidate)}"
+    )
+    # True when upstream is failing and this is the last good snapshot
+    response.headers["X-Trends-Stale"] = "true" if error else "false"
+    return response
 
 
 # Newsletter Subscription Route
@@ -136,36 +205,47 @@ def subscribe_newsletter():
     if not email:
         return jsonify({"error": "Email is required"}), 400
 
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    try:
-        # Check if email already exists
-        cur.execute("SELECT * FROM newsletter_subscribers WHERE email = %s", (email,))
-        existing = cur.fetchone()
-
-        if existing:
-            return jsonify({"error": "Email already subscribed"}), 400
-
-        # Insert new subscriber
-        cur.execute(
-            "INSERT INTO newsletter_subscribers (email, subscribed_at) VALUES (%s, NOW())",
-            (email,)
-        )
-        conn.commit()
-
-        cur.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cur = conn.cursor()
 
-        return jsonify({"message": "Successfully subscribed!"}), 200
+        try:
+            # Check if email already exists
+            cur.execute("SELECT * FROM newsletter_subscribers WHERE email = %s", (email,))
+            existing = cur.fetchone()
 
+            if existing:
+                cur.close()
+                return jsonify({"error": "Email already subscribed"}), 400
 
-    except Exception as e:
-        print("❌ Database error:", str(e), file=sys.stderr, flush=True)
-        conn.rollback()
-        cur.close()
-        conn.close()
-        return jsonify({"error": str(e)}), 500  # TEMPORARY: send actual DB error to browser
+            # Insert new subscriber
+            cur.execute(
+                "INSERT INTO newsletter_subscribers (email, subscribed_at) VALUES (%s, NOW())",
+                (email,)
+            )
+            conn.commit()
+            cur.close()
+
+            return jsonify({"message": "Successfully subscribed!"}), 200
+
+
+        except Exception as e:
+            print("❌ Database error:", str(e), file=sys.stderr, flush=True)
+            conn.rollback()
+            cur.close()
+            return jsonify({"error": str(e)}), 500  # TEMPORARY: send actual DB error to browser
+
+
+# Runtime stats for capacity planning (DB pool and response cache counters)
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    return jsonify({
+        "db_pool": pool_stats(),
+        "catalog": catalog.stats(),
+        "tools_cache": tools_cache.stats(),
+        "static_index": screenshot_index.stats(),
+        "http": http_stats(),
+        "trends": trends_cache.stats(),
+    })
 
 
 @app.route('/')
@@ -0,0 +1,312 @@
+"""
+Async (ASGI) serving mode for the ToolCurator API.
+
+Serves the same routes and response bodies as backend/app.py, but on one
+event loop: Postgres through an asyncpg pool and SerpAPI through httpx,
+so a single process keeps hundreds of requests in flight instead of one
+per sync worker.
+
+    uvicorn backend.asgi:app --host 0.0.0.0 --port $PORT
+
+Compare the two modes with load_test.py.
+"""
+import asyncio
+import os
+import sys
+
+import httpx
+from quart import Quart, abort, jsonify, redirect, request
+from quart.wrappers.response import FileBody
+from quart_cors import cors
+
+# Make the project root importable when run directly (python backend/asgi.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.async_db import acquire, create_pool, pool_stats, to_asyncpg
+from backend.catalog_snapshot import CATALOG_POLL_INTERVAL, CATALOG_QUERY, CatalogCache, CatalogSnapshot
+from backend.db_pool import PoolTimeout
+from backend.response_cache import ResponseCache
+from backend.response_encoding import EncodedBody, encoded_json_response
+from backend.schema import run_migrations
+from backend.static_files import (
+    STATIC_ACCEL_PREFIX,
+    offload_response,
+    screenshot_index,
+    set_validators,
+    variant_fallback,
+)
+from backend.tool_queries import (
+    DEFAULT_SEARCH_LIMIT,
+    InvalidQuery,
+    parse_fields,
+    parse_limit,
+    parse_search_query,
+    search_page,
+    search_query,
+    tool_to_dict,
+    tools_page,
+    tools_page_query,
+)
+from backend.trends import AsyncTrendsCache
+
+app = Quart(__name__)
+app = cors(app, allow_origin="*")  # Allow requests from Next.js frontend
+
+# The whole catalog in memory; _watch_catalog_version reloads it when a writer bumps the version
+catalog = CatalogCache(dumps=app.json.dumps, read_version=None, load=None)
+
+# Paginated /api/tools responses, dropped whenever the catalog snapshot changes
+tools_cache = ResponseCache(
+    maxsize=int(os.getenv("TOOLS_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("TOOLS_CACHE_TTL", "300")),
+)
+
+# Set up in before_serving, on the server's event loop
+db = None
+http = None
+trends_cache = None
+_background = []
+
+
+async def _refresh_catalog():
+    # The asyncpg counterpart of CatalogCache.refresh(); building runs off the event loop
+    query, params = to_asyncpg(CATALOG_QUERY)
+    try:
+        async with acquire(db) as conn:
+            if await conn.fetchval("SELECT version FROM catalog_version") == catalog.version:
+                return
+            # Same MVCC snapshot for both statements, so the version matches the rows
+            async with conn.transaction(isolation="repeatable_read", readonly=True):
+                version = await conn.fetchval("SELECT version FROM catalog_version")
+                rows = await conn.fetch(query, *params)
+        snapshot = await asyncio.to_thread(CatalogSnapshot, version or 0, rows)
+        await asyncio.to_thread(catalog.install, snapshot)
+    except Exception as e:
+        catalog.record_failure(e)
+
+
+async def _watch_catalog_version():
+    while True:
+        await asyncio.sleep(CATALOG_POLL_INTERVAL)
+        await _refresh_catalog()
+
+
+@app.before_serving
+async def startup():
+    global db, http, trends_cache
+    # Bring the schema up to date before serving (serialized by an advisory lock across workers)
+    # A failure stops the worker from starting rather than serving against an old schema
+    try:
+        await asyncio.to_thread(run_migrations)
+    except Exception as e:
+        print("❌ Schema migration failed:", str(e), file=sys.stderr, flush=True)
+        raise
+
+    db = await create_pool()
+    http = httpx.AsyncClient(limits=httpx.Limits(max_keepalive_connections=10))
+    trends_cache = AsyncTrendsCache(http)
+    trends_cache.start()
+    await _refresh_catalog()
+    _background.append(asyncio.get_running_loop().create_task(_watch_catalog_version()))
+
+
+@app.after_serving
+async def shutdown():
+    for task in _background:
+        task.cancel()
+    await trends_cache.stop()
+    await http.aclose()
+    await db.close()
+
+
+# Pool exhausted: shed load instead of queueing requests indefinitely
+@app.errorhandler(PoolTimeout)
+async def handle_pool_timeout(e):
+    print("❌ Database pool exhausted:", str(e), file=sys.stderr, flush=True)
+    response = jsonify({"error": "Database busy, please retry"})
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
+
+
+# API Route: Get AI Tools with Source and Type Filtering
+@app.route('/api/tools', methods=['GET'])
+async def get_ai_tools():
+    source_filter = request.args.get("source")
+    type_filter = request.args.get("filter", "new")  # Default to 'new' if not specified
+    limit_param = request.args.get("limit")
+    after = request.args.get("after")
+    fields_param = request.args.get("fields")
+
+    # Only paginated requests get the {"tools": [...], "next_cursor": ...} envelope
+    paginated = bool(limit_param or after)
+
+    try:
+        fields = parse_fields(fields_param)
+        limit = parse_limit(limit_param)
+    except InvalidQuery as e:
+        return jsonify({"error": str(e)}), 400
+
+    snapshot = catalog.get()
+    if snapshot is not None:
+        if not paginated:
+            # The common case: a pre-serialized body straight from memory
+            encoded = snapshot.body(type_filter, source_filter, fields, request.host_url, app.json.dumps)
+            return encoded_json_response(app.response_class, encoded, request.headers)
+        tools_cache.observe_version(snapshot.version)
+
+    cache_key = (source_filter, type_filter, request.host_url, limit_param, after, fields_param)
+    encoded = tools_cache.get(cache_key) if snapshot is not None else None
+    if encoded is not None:
+        return encoded_json_response(app.response_class, encoded, request.headers)
+
+    try:
+        if snapshot is not None:
+            rows, next_cursor, fell_back = snapshot.page(type_filter, source_filter, fields, limit=limit, after=after)
+        else:
+            # No snapshot yet (database was unreachable): query directly, don't cache
+            query, params = to_asyncpg(*tools_page_query(source_filter, type_filter, fields, limit, after))
+            async with acquire(db) as conn:
+                rows = await conn.fetch(query, *params)
+            rows, next_cursor, fell_back = tools_page(rows, limit, after)
+    except InvalidQuery as e:
+        return jsonify({"error": str(e)}), 400
+
+    tools = [tool_to_dict(row, fields, request.host_url) for row in rows]
+    if paginated:
+        payload = {"tools": tools, "next_cursor": next_cursor, "fell_back": fell_back}
+    else:
+        payload = tools
+
+    encoded = EncodedBody(
+        (app.json.dumps(payload) + "\n").encode("utf-8"),
+        # Tells the client the source had no tools and top tools from all sources were returned
+        headers={"X-Source-Fallback": "true" if fell_back else "false"},
+    )
+    if snapshot is not None:
+        tools_cache.set(cache_key, encoded)
+    return encoded_json_response(app.response_class, encoded, request.headers)
+
+
+# API Route: Ranked full-text search over names, descriptions and categories
+@app.route('/api/tools/search', methods=['GET'])
+async def search_ai_tools():
+    limit_param = request.args.get("limit")
+    after = request.args.get("after")
+    fields_param = request.args.get("fields")
+
+    try:
+        tsquery = parse_search_query(request.args.get("q"))
+        fields = parse_fields(fields_param)
+        limit = parse_limit(limit_param) or DEFAULT_SEARCH_LIMIT
+        query, params = to_asyncpg(*search_query(tsquery, fields, limit, after))
+    except InvalidQuery as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Type-ahead repeats the same prefixes; results live as long as the catalog snapshot
+    snapshot = catalog.get()
+    if snapshot is not None:
+        tools_cache.observe_version(snapshot.version)
+    cache_key = ("search", tsquery, request.host_url, limit, after, fields_param)
+    encoded = tools_cache.get(cache_key) if snapshot is not None else None
+    if encoded is not None:
+        return encoded_json_response(app.response_class, encoded, request.headers)
+
+    async with acquire(db) as conn:
+        rows = await conn.fetch(query, *params)
+    rows, next_cursor, truncated = search_page(rows, limit)
+
+    tools = [tool_to_dict(row, fields, request.host_url) for row in rows]
+    encoded = EncodedBody((app.json.dumps({"tools": tools, "next_cursor": next_cursor, "truncated": truncated}) + "\n").encode("utf-8"))
+    if snapshot is not None:
+        tools_cache.set(cache_key, encoded)
+    return encoded_json_response(app.response_class, encoded, request.headers)
+
+
+# Serve screenshots (same index, validators and offload settings as backend/static_files.py)
+@app.route('/static/screenshots/<path:filename>')
+async def serve_screenshot(filename):
+    # Resized variants missing from disk (not backfilled yet): send the client to the original
+    fallback = variant_fallback(filename)
+    if fallback is not None:
+        return redirect(fallback, 302)
+    entry = screenshot_index.lookup(filename)
+    if entry is None:
+        abort(404)
+
+    response = offload_response(app.response_class, entry, filename, STATIC_ACCEL_PREFIX)
+    if response is not None:
+        return set_validators(response, entry)
+
+    response = app.response_class(FileBody(entry.path), mimetype=entry.mimetype)
+    response.content_length = entry.size
+    set_validators(response, entry)
+    return await response.make_conditional(request, accept_ranges=True, complete_length=entry.size)
+
+
+# New API Route to Fetch All Trends
+@app.route('/api/trends/test', methods=['GET'])
+async def test_google_trends():
+    trends, age, error = await trends_cache.get()
+    if trends is None:
+        response = jsonify([f"Error fetching trends: {error}"])
+        response.headers["Cache-Control"] = "no-store"
+        return response
+
+    response = jsonify(trends)
+    response.headers["Age"] = str(int(age))
+    # Let browsers/CDNs apply the same freshness and stale-while-revalidate windows
+    fresh_for = max(0, int(trends_cache.refresh_interval - age))
+    response.headers["Cache-Control"] = (
+        f"public, max-age={fresh_for}, stale-while-revalidate={int(trends_cache.stale_while_revalidate)}"
+    )
+    # True when upstream is failing and this is the last good snapshot
+    response.headers["X-Trends-Stale"] = "true" if error else "false"
+    return response
+
+
+# Newsletter Subscription Route
+@app.route('/api/subscribe', methods=['POST'])
+async def subscribe_newsletter():
+    data = await request.get_json()
+    email = data.get('email')
+
+    if not email:
+        return jsonify({"error": "Email is required"}), 400
+
+    async with acquire(db) as conn:
+        try:
+            # Check if email already exists
+            if await conn.fetchval("SELECT 1 FROM newsletter_subscribers WHERE email = $1", email):
+                return jsonify({"error": "Email already subscribed"}), 400
+
+            # Insert new subscriber
+            await conn.execute(
+                "INSERT INTO newsletter_subscribers (email, subscribed_at) VALUES ($1, NOW())",
+                email,
+            )
+            return jsonify({"message": "Successfully subscribed!"}), 200
+
+        except Exception as e:
+            print("❌ Database error:", str(e), file=sys.stderr, flush=True)
+            return jsonify({"error": str(e)}), 500  # TEMPORARY: send actual DB error to browser
+
+
+# Runtime stats for capacity planning (DB pool and response cache counters)
+@app.route('/api/stats', methods=['GET'])
+async def get_stats():
+    return jsonify({
+        "db_pool": pool_stats(db),
+        "catalog": catalog.stats(),
+        "tools_cache": tools_cache.stats(),
+        "static_index": screenshot_index.stats(),
+        "trends": trends_cache.stats(),
+    })
+
+
+@app.route('/')
+async def home():
+    return jsonify({"message": "ToolCurator.ai API is live!"})
+
+if __name__ == '__main__':
+    app.run(debug=True, port=5001)
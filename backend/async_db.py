@@ -0,0 +1,87 @@
+import asyncio
+import os
+import re
+from contextlib import asynccontextmanager
+
+import asyncpg
+from psycopg2 import sql
+
+from backend.db_pool import DB_POOL_MIN, DB_POOL_TIMEOUT, PoolTimeout, db_config
+
+# One event loop serves many requests, so it needs more connections than a sync worker
+ASYNC_DB_POOL_MAX = int(os.getenv("ASYNC_DB_POOL_MAX", "20"))
+
+_PLACEHOLDER_RE = re.compile(r"%%|%s")
+
+
+async def create_pool(min_size=DB_POOL_MIN, max_size=ASYNC_DB_POOL_MAX):
+    """
+    Create an asyncpg pool from the same DB_* settings as db_pool.
+    """
+    config = db_config()
+    return await asyncpg.create_pool(
+        database=config["dbname"],
+        user=config["user"],
+        password=config["password"],
+        host=config["host"],
+        port=int(config["port"]) if config["port"] else None,
+        min_size=min_size,
+        max_size=max_size,
+    )
+
+
+@asynccontextmanager
+async def acquire(pool, timeout=DB_POOL_TIMEOUT):
+    """
+    Borrow a connection for an ``async with`` block, raising PoolTimeout
+    (as db_pool does) if none frees up within ``timeout`` seconds.
+    """
+    try:
+        conn = await pool.acquire(timeout=timeout)
+    except asyncio.TimeoutError:
+        raise PoolTimeout(f"No database connection available within {timeout}s")
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+
+def pool_stats(pool):
+    if pool is None:
+        return None
+    return {
+        "pid": os.getpid(),
+        "max_size": pool.get_max_size(),
+        "open": pool.get_size(),
+        "idle": pool.get_idle_size(),
+    }
+
+
+def _render(composable):
+    if isinstance(composable, sql.Composed):
+        return "".join(_render(part) for part in composable.seq)
+    if isinstance(composable, sql.SQL):
+        return composable.string
+    if isinstance(composable, sql.Identifier):
+        return ".".join('"' + name.replace('"', '""') + '"' for name in composable.strings)
+    if isinstance(composable, sql.Literal):
+        value = composable.wrapped
+        if isinstance(value, bool):
+            return "TRUE" if value else "FALSE"
+        if isinstance(value, int):
+            return str(value)
+    raise TypeError(f"Cannot render {composable!r} for asyncpg")
+
+
+def to_asyncpg(query, params=()):
+    """
+    Translate a psycopg2 query (str or sql.Composable with %s placeholders)
+    into asyncpg's $1, $2, ... form, so query builders can serve both drivers.
+
+    Returns:
+        tuple: (query text, args list)
+    """
+    text = query if isinstance(query, str) else _render(query)
+    counter = iter(range(1, len(params) + 1))
+    text = _PLACEHOLDER_RE.sub(lambda m: "%" if m.group() == "%%" else f"${next(counter)}", text)
+    return text, list(params)
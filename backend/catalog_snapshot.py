@@ -0,0 +1,335 @@
+"""
+In-memory snapshot of the tool catalog, serving /api/tools without Postgres.
+
+ai_tools is small and read-mostly, so each process keeps every row in a
+CatalogSnapshot indexed by (type, source) and by type alone, and keeps the
+serialized response bytes per (host, fields, type, source), least recently
+used first out. A background thread polls catalog_version (bumped by every
+writer, see backend/catalog_version.py) and, when it changes, loads a new
+snapshot, re-serializes the bodies requested from the old one and swaps it
+in, so requests only ever do a dictionary lookup.
+"""
+import bisect
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from psycopg2 import sql
+
+from backend.catalog_version import read_catalog_version
+from backend.db_pool import pooled_connection
+from backend.response_encoding import EncodedBody
+from backend.tool_queries import TOOL_FIELDS, decode_cursor, encode_cursor, tool_to_dict
+
+# Seconds between catalog_version polls
+CATALOG_POLL_INTERVAL = float(os.getenv("CATALOG_POLL_INTERVAL", "5"))
+# Serialized bodies kept per snapshot; beyond this, the least recently used is dropped
+CATALOG_MAX_BODIES = int(os.getenv("CATALOG_MAX_BODIES", "1024"))
+
+CATALOG_QUERY = sql.SQL("SELECT id, {columns} FROM ai_tools ORDER BY id").format(
+    columns=sql.SQL(", ").join(sql.Identifier(column) for column in TOOL_FIELDS),
+)
+
+_TYPE = 1 + TOOL_FIELDS.index("type")
+_SOURCE = 1 + TOOL_FIELDS.index("source")
+
+# Body key for any (type, source) that selects nothing
+_EMPTY = (None, None, False)
+
+
+def _listing_body(rows, fields, host_url, fell_back, dumps):
+    positions = [0] + [1 + TOOL_FIELDS.index(field) for field in fields]
+    tools = [tool_to_dict([row[i] for i in positions], fields, host_url) for row in rows]
+    return EncodedBody(
+        (dumps(tools) + "\n").encode("utf-8"),
+        # Tells the client the source had no tools and top tools from all sources were returned
+        headers={"X-Source-Fallback": "true" if fell_back else "false"},
+    )
+
+
+class CatalogSnapshot:
+    """
+    Every ai_tools row of one catalog version, as (id, *TOOL_FIELDS) tuples
+    ordered by id and grouped by (type, source) and (type, None).
+
+    ``page()`` answers the same questions as tool_queries.fetch_tools;
+    ``body()`` returns the full unpaginated /api/tools response.
+    """
+
+    def __init__(self, version, rows, max_bodies=CATALOG_MAX_BODIES):
+        self.version = version
+        self.loaded_at = time.time()
+        self.max_bodies = max_bodies
+        self.size = 0
+
+        self._rows = {}  # (type, source or None) -> [row, ...] by id
+        for row in rows:
+            row = tuple(row)
+            self._rows.setdefault((row[_TYPE], row[_SOURCE]), []).append(row)
+            self._rows.setdefault((row[_TYPE], None), []).append(row)
+            self.size += 1
+        self._ids = {key: [row[0] for row in group] for key, group in self._rows.items()}
+
+        # (host_url, fields, type, source, fell_back) -> EncodedBody, least recently used first.
+        # The host comes from the request, so a flood of made-up Host headers only
+        # evicts bodies and nothing outlives the snapshot unless it was requested.
+        self._bodies = OrderedDict()
+        self._requested = set()  # body keys served to a request (not just prewarmed)
+        self._lock = threading.Lock()
+
+    def _listing(self, type_filter, source_filter):
+        """
+        Resolve an unpaginated filter as fetch_tools does: a source without
+        "top" tools falls back to the top tools of every source.
+
+        Returns:
+            tuple: ((type, source, fell_back) key, rows)
+        """
+        if source_filter:
+            key = (type_filter, source_filter)
+            if key in self._rows:
+                return key + (False,), self._rows[key]
+            if type_filter != "top":
+                return _EMPTY, []
+        key = (type_filter, None)
+        if key not in self._rows:
+            return _EMPTY, []
+        return key + (bool(source_filter),), self._rows[key]
+
+    def page(self, type_filter, source_filter, columns=TOOL_FIELDS, limit=None, after=None):
+        """
+        In-memory tool_queries.fetch_tools (same arguments, same results).
+
+        Returns:
+            tuple: (rows, next_cursor, fell_back) where each row is (id, *columns)
+        """
+        after_id, fell_back = decode_cursor(after) if after else (None, False)
+        if after_id is None:
+            (_, _, fell_back), rows = self._listing(type_filter, source_filter)
+        else:
+            # Later pages stay on whichever listing the first page chose
+            key = (type_filter, source_filter if source_filter and not fell_back else None)
+            rows = self._rows.get(key, [])
+            rows = rows[bisect.bisect_right(self._ids.get(key, []), after_id):]
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][0], fell_back)
+
+        positions = [0] + [1 + TOOL_FIELDS.index(column) for column in columns]
+        return [tuple(row[i] for i in positions) for row in rows], next_cursor, fell_back
+
+    def body(self, type_filter, source_filter, fields, host_url, dumps):
+        """
+        The serialized unpaginated /api/tools response for a filter.
+
+        Args:
+            type_filter (str): Tool type ("new" or "top")
+            source_filter (str or None): Source to restrict to
+            fields (tuple): Fields from tool_queries.parse_fields
+            host_url (str): Request host, used in screenshot URLs
+            dumps (callable): JSON serializer of the serving app
+
+        Returns:
+            EncodedBody: Body plus its X-Source-Fallback header
+        """
+        listing, rows = self._listing(type_filter, source_filter)
+        return self._body((host_url, fields) + listing, rows, dumps)
+
+    def _body(self, key, rows, dumps, requested=True):
+        with self._lock:
+            encoded = self._bodies.get(key)
+            if encoded is not None:
+                self._bodies.move_to_end(key)
+                if requested:
+                    self._requested.add(key)
+                return encoded
+
+        host_url, fields, _, _, fell_back = key
+        encoded = _listing_body(rows, fields, host_url, fell_back, dumps)
+        with self._lock:
+            encoded = self._bodies.setdefault(key, encoded)
+            self._bodies.move_to_end(key)
+            if requested:
+                self._requested.add(key)
+            while len(self._bodies) > self.max_bodies:
+                evicted, _ = self._bodies.popitem(last=False)
+                self._requested.discard(evicted)
+        return encoded
+
+    def prewarm(self, body_keys, dumps):
+        """
+        Serialize the bodies for ``body_keys`` (those an older snapshot
+        served, least recently used first) before this snapshot takes traffic.
+        """
+        for key in body_keys:
+            _, _, type_filter, source_filter, _ = key
+            if type_filter is None:
+                self._body(key, [], dumps, requested=False)
+            elif (type_filter, source_filter) in self._rows:
+                self._body(key, self._rows[(type_filter, source_filter)], dumps, requested=False)
+
+    def body_keys(self):
+        """
+        Returns:
+            list: Keys of the cached bodies requested from this snapshot,
+            least recently used first (prewarmed bodies nobody asked for
+            again are left out, so they don't carry over forever)
+        """
+        with self._lock:
+            return [key for key in self._bodies if key in self._requested]
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "tools": self.size,
+            "listings": len(self._rows),
+            "bodies": len(self._bodies),
+            "requested_bodies": len(self._requested),
+            "max_bodies": self.max_bodies,
+            "age_s": round(time.time() - self.loaded_at, 1),
+        }
+
+
+def load_snapshot(cur, max_bodies=CATALOG_MAX_BODIES):
+    """
+    Read catalog_version and every ai_tools row from one consistent view.
+
+    Returns:
+        CatalogSnapshot
+    """
+    # Same MVCC snapshot for both statements, so the version matches the rows
+    cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+    version = read_catalog_version(cur)
+    cur.execute(CATALOG_QUERY)
+    snapshot = CatalogSnapshot(version, cur.fetchall(), max_bodies)
+    cur.connection.rollback()
+    return snapshot
+
+
+def _read_version():
+    with pooled_connection() as conn:
+        cur = conn.cursor()
+        version = read_catalog_version(cur)
+        conn.rollback()
+        cur.close()
+        return version
+
+
+def _load():
+    with pooled_connection() as conn:
+        cur = conn.cursor()
+        try:
+            return load_snapshot(cur)
+        finally:
+            cur.close()
+
+
+class CatalogCache:
+    """
+    Holds the current CatalogSnapshot and replaces it when catalog_version
+    changes.
+
+    With the default loaders a background thread polls every
+    ``poll_interval`` seconds (and the first request loads synchronously).
+    Pass ``read_version=None`` to drive it yourself through ``install()``,
+    e.g. from an asyncio task.
+    """
+
+    def __init__(self, dumps, read_version=_read_version, load=_load, poll_interval=CATALOG_POLL_INTERVAL):
+        self.dumps = dumps
+        self.read_version = read_version
+        self.load = load
+        self.poll_interval = poll_interval
+
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # single flight
+        self._thread = None
+        self._thread_pid = None
+
+        self._refreshes = 0
+        self._failures = 0
+        self._last_error = None
+
+    @property
+    def version(self):
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else None
+
+    def start(self):
+        # Threads don't survive a fork, so each gunicorn worker starts its own
+        if self.read_version is None:
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid() and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="catalog-refresher", daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_interval)
+            self.refresh()
+
+    def refresh(self):
+        """
+        Load a new snapshot if catalog_version moved; on failure keep the old one.
+
+        Returns:
+            bool: True if the snapshot was replaced
+        """
+        with self._refresh_lock:
+            try:
+                if self._snapshot is not None and self.read_version() == self._snapshot.version:
+                    return False
+                snapshot = self.load()
+            except Exception as e:
+                self.record_failure(e)
+                return False
+            self.install(snapshot)
+            return True
+
+    def install(self, snapshot):
+        """
+        Pre-serialize what the current snapshot served, then swap ``snapshot`` in.
+        """
+        previous = self._snapshot
+        if previous is not None:
+            snapshot.prewarm(previous.body_keys(), self.dumps)
+        with self._lock:
+            self._snapshot = snapshot
+            self._refreshes += 1
+            self._last_error = None
+
+    def record_failure(self, error):
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error)
+        print("❌ Catalog snapshot refresh failed:", str(error), file=sys.stderr, flush=True)
+
+    def get(self):
+        """
+        Returns:
+            CatalogSnapshot or None: None until a snapshot could be loaded
+        """
+        self.start()
+        if self._snapshot is None and self.read_version is not None:
+            self.refresh()
+        return self._snapshot
+
+    def stats(self):
+        snapshot = self._snapshot
+        with self._lock:
+            stats = snapshot.stats() if snapshot is not None else {}
+            stats.update({
+                "refreshes": self._refreshes,
+                "failures": self._failures,
+                "last_error": self._last_error,
+                "poll_interval_s": self.poll_interval,
+            })
+            return stats
@@ -0,0 +1,45 @@
+import psycopg2
+
+# catalog_version (created by backend/schema.py) is a single-row counter that
+# every writer of ai_tools bumps, so readers (e.g. the API response cache)
+# can tell when the catalog changed.
+
+
+def bump_catalog_version(cur):
+    """
+    Increment the catalog version inside the caller's transaction.
+
+    Call this from any script that writes to ai_tools, before committing,
+    so the bump becomes visible together with the data.
+
+    Args:
+        cur: Cursor on the writer's connection
+
+    Returns:
+        int: The new catalog version
+    """
+    cur.execute(
+        """
+        INSERT INTO catalog_version (id, version, updated_at) VALUES (TRUE, 1, NOW())
+        ON CONFLICT (id) DO UPDATE
+        SET version = catalog_version.version + 1, updated_at = NOW()
+        RETURNING version
+        """
+    )
+    return cur.fetchone()[0]
+
+
+def read_catalog_version(cur):
+    """
+    Read the current catalog version.
+
+    Returns:
+        int: The version, or 0 if no writer has bumped it yet
+    """
+    try:
+        cur.execute("SELECT version FROM catalog_version")
+    except psycopg2.errors.UndefinedTable:
+        cur.connection.rollback()
+        return 0
+    row = cur.fetchone()
+    return row[0] if row else 0
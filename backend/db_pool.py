@@ -0,0 +1,275 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+
+# Pool sizing - tune per gunicorn worker (total = workers * DB_POOL_MAX)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "5"))
+# Seconds a request waits for a free connection before giving up
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+# Connections idle longer than this are pinged before being handed out
+DB_POOL_HEALTH_CHECK_AFTER = float(os.getenv("DB_POOL_HEALTH_CHECK_AFTER", "30"))
+
+
+def db_config():
+    return {
+        "dbname": os.getenv("DB_NAME"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+        "host": os.getenv("DB_HOST"),
+        "port": os.getenv("DB_PORT"),
+    }
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    Size-bounded, thread-safe pool of psycopg2 connections.
+
+    Connections are opened lazily up to ``maxconn``. Once the pool is full,
+    callers block for up to ``timeout`` seconds waiting for a release.
+    """
+
+    def __init__(self, minconn=DB_POOL_MIN, maxconn=DB_POOL_MAX, timeout=DB_POOL_TIMEOUT,
+                 health_check_after=DB_POOL_HEALTH_CHECK_AFTER, **connect_kwargs):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self.connect_kwargs = connect_kwargs or db_config()
+        self.pid = os.getpid()
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connection, released_at)
+        self._opened = 0
+        self._in_use = 0
+
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._connects = 0
+        self._discarded = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+        for _ in range(minconn):
+            conn = self._connect()
+            self._opened += 1
+            self._idle.append((conn, time.monotonic()))
+
+    def _connect(self):
+        conn = psycopg2.connect(**self.connect_kwargs)
+        with self._cond:
+            self._connects += 1
+        return conn
+
+    def _is_healthy(self, conn, idle_for):
+        if conn.closed:
+            return False
+        if idle_for < self.health_check_after:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        """
+        Check a connection out of the pool.
+
+        Returns:
+            connection: A psycopg2 connection that must be handed back with putconn()
+
+        Raises:
+            PoolTimeout: If the pool stayed exhausted for ``timeout`` seconds
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        conn = None
+        released_at = None
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    # LIFO keeps the most recently used (warmest) connections busy
+                    conn, released_at = self._idle.pop()
+                    break
+                if self._opened < self.maxconn:
+                    self._opened += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f"No database connection available after {self.timeout}s "
+                        f"({self._in_use}/{self.maxconn} in use)"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            wait = time.monotonic() - started
+            self._checkouts += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            if waited:
+                self._waits += 1
+
+        try:
+            if conn is not None and not self._is_healthy(conn, time.monotonic() - released_at):
+                with self._cond:
+                    self._discarded += 1
+                self._close_quietly(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        return conn
+
+    def putconn(self, conn, discard=False):
+        """
+        Return a connection to the pool, rolling back any open transaction.
+
+        Args:
+            conn: Connection previously returned by getconn()
+            discard (bool): Close the connection instead of keeping it
+        """
+        if os.getpid() != self.pid:
+            # Inherited from the parent process across a fork; never touch it
+            return
+
+        if not discard and not conn.closed:
+            try:
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        if discard or conn.closed:
+            self._close_quietly(conn)
+            with self._cond:
+                self._opened -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._close_quietly(conn)
+                self._opened -= 1
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        """
+        Snapshot of pool occupancy and checkout wait times.
+
+        Returns:
+            dict: Counters suitable for sizing DB_POOL_MAX
+        """
+        with self._cond:
+            return {
+                "pid": self.pid,
+                "max_size": self.maxconn,
+                "open": self._opened,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "connects": self._connects,
+                "discarded": self._discarded,
+                "avg_wait_ms": round(self._total_wait / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+# Pools inherited across a fork. Their sockets still belong to the parent, and
+# freeing a psycopg2 connection sends the server a Terminate message over the
+# shared socket, so the child keeps them referenced and never closes them.
+_inherited_pools = []
+
+
+def get_pool():
+    """
+    Return the process-wide pool, creating it on first use.
+
+    A pool created before a fork (e.g. gunicorn --preload) is abandoned in the
+    child rather than closed, because its sockets still belong to the parent.
+    """
+    global _pool
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            if _pool is not None:
+                _inherited_pools.append(_pool)
+            _pool = ConnectionPool()
+        return _pool
+
+
+def _forget_pool_after_fork():
+    global _pool, _pool_lock
+    if _pool is not None:
+        _inherited_pools.append(_pool)
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_pool_after_fork)
+
+
+@contextmanager
+def pooled_connection():
+    """
+    Borrow a pooled connection for the duration of a ``with`` block.
+
+    Uncommitted work is rolled back when the connection is returned.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+
+def pool_stats():
+    if _pool is None or _pool.pid != os.getpid():
+        return None
+    return _pool.stats()
@@ -1,17 +1,20 @@
-import requests
 import psycopg2
 import os
-import urllib.parse
-from PIL import Image
-from io import BytesIO
+import sys
+from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables (before importing modules that read settings)
 load_dotenv()
 
-# Set the path to your screenshots directory
-PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
-SCREENSHOTS_DIR = os.path.join(PROJECT_ROOT, "backend", "static", "screenshots")
+# Make the project root importable when run as a script (python backend/fetch_og_images.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.catalog_version import bump_catalog_version
+from backend.schema import run_migrations
+from backend.screenshot_capture import capture_many
+from backend.screenshot_store import record_failures, record_screenshots, tools_missing_screenshots
+from backend.screenshot_variants import SCREENSHOTS_DIR
 
 SOURCES = [
     "FutureTools.io",
@@ -21,8 +24,6 @@ SOURCES = [
     "AI Tools Directory"
 ]
 
-FILTERS = ["new"]
-
 
 def get_db_connection():
     return psycopg2.connect(
@@ -34,104 +35,30 @@ def get_db_connection():
     )
 
 
-def screenshot_exists(tool_name):
-    """
-    Check if a screenshot exists for a given tool name.
-
-    Args:
-        tool_name (str): Name of the tool to check
-
-    Returns:
-        bool: True if screenshot exists and is not empty, False otherwise
-    """
-    # Convert tool name to screenshot filename
-    filename = f"{tool_name.replace(' ', '_').lower()}.png"
-    file_path = os.path.join(SCREENSHOTS_DIR, filename)
-
-    # Check if file exists and is not empty
-    return os.path.exists(file_path) and os.path.getsize(file_path) > 0
-
-
 def get_tools_without_screenshots():
     """
-    Retrieve tools that do not have existing screenshots.
+    Retrieve displayed tools (as on the homepage: the first DISPLAYED_PER_SOURCE
+    "new" tools of each source and every "top" tool) that do not have existing
+    screenshots, according to the screenshot manifest (run
+    ``python -m backend.screenshot_store --sync`` after changing files on disk
+    by hand).
 
     Returns:
         list: Tools without screenshots
     """
     conn = get_db_connection()
     cur = conn.cursor()
-
-    displayed_tools = []
-
-    for source in SOURCES:
-        cur.execute(
-            """
-            SELECT name, source_url
-            FROM ai_tools 
-            WHERE source = %s
-            """,
-            (source,)
-        )
-
-        all_tools = cur.fetchall()
-        displayed_tools.extend(all_tools[:8])
-
+    tools_without_screenshots = tools_missing_screenshots(cur, SOURCES)
     cur.close()
     conn.close()
 
-    # Filter out tools that already have screenshots
-    tools_without_screenshots = [
-        tool for tool in displayed_tools
-        if not screenshot_exists(tool[0])
-    ]
-
     return tools_without_screenshots
 
 
-def save_screenshot(url, name):
-    """
-    Save a screenshot for a given tool.
-
-    Args:
-        url (str): URL of the tool
-        name (str): Name of the tool
-
-    Returns:
-        str or None: Path to saved screenshot, or None if failed
-    """
-    try:
-        filename = f"{name.replace(' ', '_').lower()}.png"
-        save_path = os.path.join(SCREENSHOTS_DIR, filename)
-
-        if not url or url.strip() == "":
-            print(f"No URL provided for {name}, skipping...")
-            return None
-
-        api_key = os.getenv("SCREENSHOTONE_API_KEY")
-        screenshot_url = f"https://api.screenshotone.com/take?access_key={api_key}&url={url}&viewport_width=1280&viewport_height=800&format=png"
-
-        response = requests.get(screenshot_url)
-        if response.status_code == 200:
-            img = Image.open(BytesIO(response.content))
-
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-
-            img.save(save_path)
-            return f"/static/screenshots/{filename}"
-        else:
-            print(f"Error taking screenshot: HTTP {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"Exception while taking screenshot: {e}")
-        return None
-
-
 def update_displayed_screenshot_urls():
     """
     Update screenshot URLs for tools without existing screenshots.
     """
-    print(f"Project root: {PROJECT_ROOT}")
     print(f"Using screenshot directory: {SCREENSHOTS_DIR}")
 
     # Ensure screenshot directory exists
@@ -142,21 +69,34 @@ def update_displayed_screenshot_urls():
 
     print(f"Found {len(tools_to_process)} tools without screenshots")
 
+    # Capture concurrently, then write all successful paths in one statement
+    tool_ids = {source_url: tool_id for tool_id, _, source_url in tools_to_process}
+    results = capture_many([(name, source_url) for _, name, source_url in tools_to_process])
+    captured = [(name, url, path) for name, url, path, _ in results if path]
+    updates = [(url, path) for _, url, path in captured]
+    failures = [(tool_ids[url], error) for _, url, path, error in results if not path]
+    print(f"Captured {len(updates)} of {len(results)} screenshots")
+
+    if not results:
+        return
+
     conn = get_db_connection()
     cur = conn.cursor()
 
-    for name, url in tools_to_process:
-        print(f"Generating screenshot for {name} ({url})...")
-        screenshot_path = save_screenshot(url, name)
-
-        if screenshot_path:
-            print(f"🖼️ Saved Screenshot: {screenshot_path}")
-            cur.execute(
-                "UPDATE ai_tools SET screenshot_url = %s WHERE source_url = %s;",
-                (screenshot_path, url),
-            )
-        else:
-            print(f"❌ Failed to generate screenshot for {name}")
+    # Failures go to the manifest too, so the last error is visible in the report
+    record_failures(cur, failures)
+    if updates:
+        execute_values(
+            cur,
+            """
+            UPDATE ai_tools SET screenshot_url = v.screenshot_url
+            FROM (VALUES %s) AS v (source_url, screenshot_url)
+            WHERE ai_tools.source_url = v.source_url
+            """,
+            updates,
+        )
+        record_screenshots(cur, [(tool_ids[url], path) for _, url, path in captured])
+        bump_catalog_version(cur)
 
     conn.commit()
     cur.close()
@@ -164,4 +104,5 @@ def update_displayed_screenshot_urls():
 
 
 if __name__ == "__main__":
+    run_migrations()
     update_displayed_screenshot_urls()
\ No newline at end of file
@@ -0,0 +1,244 @@
+import os
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict, deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) seconds applied when a caller doesn't pass a timeout
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+# Retries of idempotent requests on connection errors and RETRY_STATUSES
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+# Keep-alive connections kept per host
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+# Hosts with a session (and metrics) kept; beyond this the least recently used is closed
+HTTP_MAX_HOSTS = int(os.getenv("HTTP_MAX_HOSTS", "256"))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+USER_AGENT = "ToolCurator/1.0 (+https://toolcurator.ai)"
+
+# Latency samples kept per host for percentiles
+LATENCY_SAMPLES = 256
+
+
+class HostMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.statuses = {}
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+
+    def snapshot(self):
+        samples = sorted(self.samples)
+
+        def percentile(p):
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))] * 1000, 1) if samples else 0.0
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "statuses": dict(self.statuses),
+            "avg_ms": round(self.total / self.requests * 1000, 1) if self.requests else 0.0,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(self.max * 1000, 1),
+        }
+
+
+class RateLimiter:
+    """
+    Token bucket per key (host): at most ``rate`` acquisitions per second,
+    with bursts of up to ``burst``.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets = {}  # key -> (tokens, updated_at)
+
+    def acquire(self, key):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, updated_at = self._buckets.get(key, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+                if tokens >= 1:
+                    self._buckets[key] = (tokens - 1, now)
+                    return
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+
+class HttpClient:
+    """
+    Outbound HTTP with one keep-alive session per host, default timeouts,
+    urllib3 retries with exponential backoff (honoring Retry-After) and
+    per-host latency metrics.
+
+    Scrapers reach an open-ended set of hosts, so sessions and metrics are
+    kept for the ``max_hosts`` most recently used ones; an evicted host's
+    session is closed and its metrics dropped.
+
+    Pass ``retries=0`` for callers that run their own retry loop.
+    """
+
+    def __init__(self, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT), retries=HTTP_MAX_RETRIES,
+                 backoff_factor=HTTP_BACKOFF_FACTOR, pool_size=HTTP_POOL_SIZE, max_hosts=HTTP_MAX_HOSTS):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.pool_size = pool_size
+        self.max_hosts = max_hosts
+        self.pid = os.getpid()
+
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()  # (scheme://host, retries) -> Session, least recently used first
+        self._metrics = OrderedDict()  # host -> HostMetrics, least recently used first
+
+    def _session(self, url, retries):
+        parts = urllib.parse.urlsplit(url)
+        key = (f"{parts.scheme}://{parts.netloc}", retries)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+            else:
+                # 0 keeps requests' own no-retry policy, so timeouts surface as Timeout
+                max_retries = Retry(
+                    total=retries,
+                    backoff_factor=self.backoff_factor,
+                    status_forcelist=RETRY_STATUSES,
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                ) if retries else 0
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=max_retries)
+                session = requests.Session()
+                session.headers["User-Agent"] = USER_AGENT
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[key] = session
+                while len(self._sessions) > self.max_hosts:
+                    # Requests still in flight on it finish; their connections close on release
+                    _, evicted = self._sessions.popitem(last=False)
+                    evicted.close()
+            return session
+
+    def request(self, method, url, timeout=None, retries=None, **kwargs):
+        """
+        Send a request through the host's pooled session.
+
+        Args:
+            method (str): HTTP method
+            url (str): Absolute URL
+            timeout (float or tuple): Overrides the (connect, read) default
+            retries (int): Overrides the retry budget (0 disables retries)
+            **kwargs: Passed to requests.Session.request
+
+        Returns:
+            requests.Response: Final response (after retries); raises
+            requests.RequestException when no response could be obtained
+        """
+        session = self._session(url, self.retries if retries is None else retries)
+        host = urllib.parse.urlsplit(url).netloc
+
+        started = time.perf_counter()
+        status = None
+        try:
+            response = session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            self._record(host, status, time.perf_counter() - started)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    def _record(self, host, status, elapsed):
+        with self._lock:
+            metrics = self._metrics.get(host)
+            if metrics is not None:
+                self._metrics.move_to_end(host)
+            else:
+                metrics = self._metrics[host] = HostMetrics()
+                while len(self._metrics) > self.max_hosts:
+                    self._metrics.popitem(last=False)
+            metrics.requests += 1
+            if status is None or status >= 500:
+                metrics.errors += 1
+            label = str(status) if status is not None else "error"
+            metrics.statuses[label] = metrics.statuses.get(label, 0) + 1
+            metrics.total += elapsed
+            metrics.max = max(metrics.max, elapsed)
+            metrics.samples.append(elapsed)
+
+    def stats(self):
+        """
+        Returns:
+            dict: host -> request/error counts, status counts and latency (avg/p50/p95/max),
+            for the ``max_hosts`` most recently used hosts
+        """
+        with self._lock:
+            return {host: metrics.snapshot() for host, metrics in sorted(self._metrics.items())}
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the process-wide client, creating it on first use.
+    """
+    global _client
+    client = _client
+    if client is None or client.pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client.pid != os.getpid():
+                _client = HttpClient()
+            client = _client
+    return client
+
+
+def _forget_client_after_fork():
+    # Keep-alive sockets belong to the parent; the child opens its own
+    global _client, _client_lock
+    _client = None
+    _client_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_client_after_fork)
+
+
+def http_get(url, **kwargs):
+    return get_client().get(url, **kwargs)
+
+
+def http_head(url, **kwargs):
+    return get_client().head(url, **kwargs)
+
+
+def http_stats():
+    """
+    Returns:
+        dict or None: Per-host metrics, or None if nothing was sent yet
+    """
+    return _client.stats() if _client is not None else None
@@ -0,0 +1,110 @@
+import gzip
+import hashlib
+
+from werkzeug.http import parse_accept_header, parse_etags
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; fall back to gzip only
+    brotli = None
+
+# Bodies smaller than this aren't worth the compression overhead
+MIN_COMPRESS_SIZE = 512
+GZIP_LEVEL = 6
+# Encoded bodies are cached alongside the response, so a high quality is affordable
+BROTLI_QUALITY = 9
+
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+
+class EncodedBody:
+    """
+    A serialized response body plus its strong ETag and compressed variants.
+
+    Compressed variants are produced on first request and kept, so a cached
+    EncodedBody only pays for each compression once. ``headers`` are extra
+    response headers that belong to this body (e.g. X-Source-Fallback).
+    """
+
+    def __init__(self, body, headers=None):
+        self.body = body
+        self.headers = headers or {}
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self._variants = {"identity": body}
+
+    def encoded(self, encoding):
+        data = self._variants.get(encoding)
+        if data is None:
+            if encoding == "br":
+                data = brotli.compress(self.body, quality=BROTLI_QUALITY)
+            elif encoding == "gzip":
+                data = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+            else:
+                raise ValueError(f"Unsupported content encoding: {encoding}")
+            self._variants[encoding] = data
+        return data
+
+
+def negotiate_encoding(accept_encoding, size):
+    """
+    Pick the best content encoding the client accepts.
+
+    Args:
+        accept_encoding (str or None): Raw Accept-Encoding request header
+        size (int): Length of the uncompressed body
+
+    Returns:
+        str: "br", "gzip" or "identity"
+    """
+    if size < MIN_COMPRESS_SIZE or not accept_encoding:
+        return "identity"
+    return parse_accept_header(accept_encoding).best_match(ENCODINGS) or "identity"
+
+
+def representation_etag(etag, encoding):
+    # Each encoding is a different representation, so it gets its own strong tag
+    return etag if encoding == "identity" else f"{etag}-{encoding}"
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Check an If-None-Match header against any representation of ``etag``.
+
+    Returns:
+        bool: True if the client's cached copy is still current
+    """
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return any(
+        etags.contains_weak(representation_etag(etag, encoding))
+        for encoding in ("identity",) + ENCODINGS
+    )
+
+
+def encoded_json_response(response_class, encoded, request_headers):
+    """
+    Conditional (ETag / 304) and compressed response for a pre-serialized JSON body.
+
+    Args:
+        response_class: Flask or Quart response class (both are werkzeug responses)
+        encoded (EncodedBody): The body
+        request_headers: Incoming request headers
+
+    Returns:
+        The response object
+    """
+    encoding = negotiate_encoding(request_headers.get("Accept-Encoding"), len(encoded.body))
+
+    if etag_matches(request_headers.get("If-None-Match"), encoded.etag):
+        response = response_class(status=304)
+    else:
+        response = response_class(encoded.encoded(encoding), mimetype="application/json")
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+
+    response.headers.update(encoded.headers)
+    response.set_etag(representation_etag(encoded.etag, encoding))
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Accept-Encoding")
+    return response
@@ -0,0 +1,457 @@
+"""
+Versioned, idempotent schema migrations for the ToolCurator database.
+
+This module owns the DDL for every table the API, scrapers and import
+scripts use. Each entry point calls run_migrations() at startup; each
+migration commits on its own and is recorded in schema_migrations, and the
+whole run holds an advisory lock, so concurrent gunicorn workers or
+scripts can't race.
+
+Usage:
+    python -m backend.schema            # apply pending migrations
+    python -m backend.schema --explain  # EXPLAIN ANALYZE the hot queries
+    python -m backend.schema --dedupe-tools  # delete duplicate tools, then migrate
+"""
+import argparse
+import os
+import sys
+
+import psycopg2
+
+# Make the project root importable when run as a script (python backend/schema.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.catalog_version import bump_catalog_version
+from backend.db_pool import db_config
+
+# Arbitrary constant identifying the migration advisory lock
+MIGRATION_LOCK_KEY = 7_311_402
+
+# (version, description, SQL). Append only - never edit an applied migration.
+MIGRATIONS = [
+    (
+        1,
+        "baseline tables",
+        """
+        CREATE TABLE IF NOT EXISTS ai_tools (
+            id SERIAL PRIMARY KEY,
+            name TEXT,
+            short_description TEXT,
+            full_description TEXT,
+            category TEXT,
+            source TEXT,
+            source_url TEXT UNIQUE,
+            screenshot_url TEXT,
+            type TEXT
+        );
+        -- Older scraper DDL created ai_tools without some of these columns
+        ALTER TABLE ai_tools ADD COLUMN IF NOT EXISTS short_description TEXT;
+        ALTER TABLE ai_tools ADD COLUMN IF NOT EXISTS full_description TEXT;
+        ALTER TABLE ai_tools ADD COLUMN IF NOT EXISTS category TEXT;
+        ALTER TABLE ai_tools ADD COLUMN IF NOT EXISTS screenshot_url TEXT;
+        ALTER TABLE ai_tools ADD COLUMN IF NOT EXISTS type TEXT;
+
+        CREATE TABLE IF NOT EXISTS newsletter_subscribers (
+            id SERIAL PRIMARY KEY,
+            email TEXT UNIQUE NOT NULL,
+            subscribed_at TIMESTAMP DEFAULT NOW()
+        );
+
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+        INSERT INTO catalog_version (id, version) VALUES (TRUE, 0) ON CONFLICT (id) DO NOTHING;
+        """,
+    ),
+    (
+        2,
+        "indexes for API, importer and screenshot lookups",
+        """
+        -- /api/tools: WHERE type = ? [AND source = ?] ORDER BY id
+        CREATE INDEX IF NOT EXISTS ai_tools_type_source_id_idx ON ai_tools (type, source, id);
+        CREATE INDEX IF NOT EXISTS ai_tools_type_id_idx ON ai_tools (type, id);
+        -- fetch_og_images: WHERE source = ?
+        CREATE INDEX IF NOT EXISTS ai_tools_source_id_idx ON ai_tools (source, id);
+        -- tool_google_sheet_upload: WHERE name = ? AND source = ?
+        CREATE INDEX IF NOT EXISTS ai_tools_name_source_idx ON ai_tools (name, source);
+        -- ss_diagnose: WHERE lower(name) = lower(?)
+        CREATE INDEX IF NOT EXISTS ai_tools_lower_name_idx ON ai_tools (lower(name));
+        CREATE INDEX IF NOT EXISTS ai_tools_screenshot_url_idx ON ai_tools (screenshot_url);
+        """,
+    ),
+    (
+        3,
+        "unique (name, source) for bulk upserts",
+        """
+        -- The sheet importer already treats (name, source) as a tool's identity.
+        -- Duplicates are never deleted here: the migration stops and lists them,
+        -- and python -m backend.schema --dedupe-tools removes them explicitly.
+        DO $$
+        DECLARE
+            conflicts TEXT;
+        BEGIN
+            SELECT string_agg(format('%s (%s): ids %s', name, source, ids), '; ') INTO conflicts
+            FROM (
+                SELECT name, source, string_agg(id::text, ', ' ORDER BY id) AS ids
+                FROM ai_tools WHERE name IS NOT NULL AND source IS NOT NULL
+                GROUP BY name, source HAVING count(*) > 1
+                ORDER BY name, source LIMIT 50
+            ) AS duplicates;
+            IF conflicts IS NOT NULL THEN
+                RAISE EXCEPTION 'ai_tools has duplicate (name, source) rows: %', conflicts
+                    USING HINT = 'Run python -m backend.schema --dedupe-tools to keep the newest row of each, then migrate again.';
+            END IF;
+        END $$;
+        DROP INDEX IF EXISTS ai_tools_name_source_idx;
+        CREATE UNIQUE INDEX IF NOT EXISTS ai_tools_name_source_key ON ai_tools (name, source);
+        """,
+    ),
+    (
+        4,
+        "content-addressed screenshot names",
+        """
+        -- screenshot key (lower-cased, underscored tool name) -> sha256 of the stored PNG
+        CREATE TABLE IF NOT EXISTS screenshot_names (
+            name TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+        CREATE INDEX IF NOT EXISTS screenshot_names_content_hash_idx ON screenshot_names (content_hash);
+        """,
+    ),
+    (
+        5,
+        "screenshot manifest",
+        """
+        -- screenshot_names grows into a manifest of every screenshot's file state,
+        -- so finding tools without a screenshot needs no filesystem walk
+        ALTER TABLE screenshot_names RENAME TO screenshot_manifest;
+        ALTER TABLE screenshot_manifest RENAME CONSTRAINT screenshot_names_pkey TO screenshot_manifest_pkey;
+        ALTER INDEX screenshot_names_content_hash_idx RENAME TO screenshot_manifest_content_hash_idx;
+        -- NULL for failed captures and for name-based files from before content addressing
+        ALTER TABLE screenshot_manifest ALTER COLUMN content_hash DROP NOT NULL;
+        -- Existing rows were recorded together with their file
+        ALTER TABLE screenshot_manifest ADD COLUMN file_exists BOOLEAN NOT NULL DEFAULT TRUE;
+        ALTER TABLE screenshot_manifest ALTER COLUMN file_exists SET DEFAULT FALSE;
+        ALTER TABLE screenshot_manifest ADD COLUMN size_bytes BIGINT;
+        ALTER TABLE screenshot_manifest ADD COLUMN captured_at TIMESTAMPTZ;
+        ALTER TABLE screenshot_manifest ADD COLUMN last_attempt_at TIMESTAMPTZ;
+        ALTER TABLE screenshot_manifest ADD COLUMN last_error TEXT;
+        UPDATE screenshot_manifest SET captured_at = updated_at, last_attempt_at = updated_at;
+
+        -- Joins ai_tools to the manifest on the screenshot key (see screenshot_store.screenshot_key)
+        CREATE INDEX IF NOT EXISTS ai_tools_screenshot_key_idx ON ai_tools ((lower(replace(name, ' ', '_'))));
+        """,
+    ),
+    (
+        6,
+        "full-text search vectors",
+        """
+        -- /api/tools/search. Stored generated columns, so every writer keeps them current.
+        -- search_vector is the whole weighted document (name A, summary and category B,
+        -- full description D) used for matching and ranking; search_title is its A/B part,
+        -- a much smaller index that finds the strongest candidates first.
+        ALTER TABLE ai_tools ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(short_description, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(category, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(full_description, '')), 'D')
+        ) STORED;
+        ALTER TABLE ai_tools ADD COLUMN IF NOT EXISTS search_title tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(short_description, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(category, '')), 'B')
+        ) STORED;
+        CREATE INDEX IF NOT EXISTS ai_tools_search_idx ON ai_tools USING GIN (search_vector);
+        CREATE INDEX IF NOT EXISTS ai_tools_search_title_idx ON ai_tools USING GIN (search_title);
+        """,
+    ),
+    (
+        7,
+        "scrape job queue",
+        """
+        -- Scrapers/orchestrator.py: one row per source scrape. A running job holds a
+        -- lease (locked_until) its orchestrator keeps extending; an expired lease means
+        -- the orchestrator died and the job is picked up again.
+        CREATE TABLE IF NOT EXISTS scrape_jobs (
+            id BIGSERIAL PRIMARY KEY,
+            source TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending'
+                CHECK (status IN ('pending', 'running', 'done', 'failed')),
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            run_after TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            locked_by TEXT,
+            locked_until TIMESTAMPTZ,
+            last_error TEXT,
+            scraped INTEGER,
+            inserted INTEGER,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            started_at TIMESTAMPTZ,
+            finished_at TIMESTAMPTZ
+        );
+        -- At most one queued or running scrape per source
+        CREATE UNIQUE INDEX IF NOT EXISTS scrape_jobs_active_source_key
+            ON scrape_jobs (source) WHERE status IN ('pending', 'running');
+        CREATE INDEX IF NOT EXISTS scrape_jobs_pending_idx
+            ON scrape_jobs (run_after, id) WHERE status = 'pending';
+        """,
+    ),
+    (
+        8,
+        "redirect cache",
+        """
+        -- Scrapers/redirect_resolver.py: outbound link -> final URL. Failures are cached
+        -- too (final_url NULL, error set), with a shorter expiry.
+        CREATE TABLE IF NOT EXISTS redirect_cache (
+            url TEXT PRIMARY KEY,
+            final_url TEXT,
+            status INTEGER,
+            error TEXT,
+            resolved_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            expires_at TIMESTAMPTZ NOT NULL
+        );
+        """,
+    ),
+    (
+        9,
+        "screenshot manifest keyed by tool id",
+        """
+        -- Name-keyed rows were shared by same-name tools of different sources. Each tool
+        -- now has its own row. A name row carries over only to the tools whose
+        -- screenshot_url points at its file; other tools get no row, so they count as
+        -- missing and are captured.
+        ALTER TABLE screenshot_manifest RENAME TO screenshot_manifest_by_name;
+        ALTER TABLE screenshot_manifest_by_name RENAME CONSTRAINT screenshot_manifest_pkey
+            TO screenshot_manifest_by_name_pkey;
+        CREATE TABLE screenshot_manifest (
+            tool_id INTEGER PRIMARY KEY REFERENCES ai_tools (id) ON DELETE CASCADE,
+            content_hash TEXT,
+            file_exists BOOLEAN NOT NULL DEFAULT FALSE,
+            size_bytes BIGINT,
+            captured_at TIMESTAMPTZ,
+            last_attempt_at TIMESTAMPTZ,
+            last_error TEXT,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+        INSERT INTO screenshot_manifest
+            (tool_id, content_hash, file_exists, size_bytes, captured_at, last_attempt_at, last_error, updated_at)
+        SELECT t.id, m.content_hash, m.file_exists, m.size_bytes, m.captured_at, m.last_attempt_at,
+               m.last_error, m.updated_at
+        FROM ai_tools t
+        JOIN screenshot_manifest_by_name m ON m.name = lower(replace(t.name, ' ', '_'))
+        WHERE t.screenshot_url = '/static/screenshots/' || coalesce(m.content_hash, m.name) || '.png';
+        DROP TABLE screenshot_manifest_by_name;
+        CREATE INDEX IF NOT EXISTS screenshot_manifest_content_hash_idx ON screenshot_manifest (content_hash);
+        DROP INDEX IF EXISTS ai_tools_screenshot_key_idx;
+        """,
+    ),
+]
+
+# Queries checked by --explain, with sample parameters
+EXPLAIN_QUERIES = [
+    (
+        "/api/tools by source",
+        "SELECT id, name FROM ai_tools WHERE type = %s AND source = %s ORDER BY id",
+        ("new", "FutureTools.io"),
+    ),
+    (
+        "/api/tools by type",
+        "SELECT id, name FROM ai_tools WHERE type = %s ORDER BY id",
+        ("top",),
+    ),
+    (
+        "importer lookup",
+        "SELECT id FROM ai_tools WHERE name = %s AND source = %s",
+        ("ChatGPT", "Toolify.ai"),
+    ),
+    (
+        "case-insensitive name",
+        "SELECT id FROM ai_tools WHERE lower(name) = lower(%s)",
+        ("ChatGPT",),
+    ),
+    (
+        "displayed tools (per-source window)",
+        """
+        SELECT id FROM (
+            SELECT id, type, ROW_NUMBER() OVER (PARTITION BY type, source ORDER BY id) AS position
+            FROM ai_tools WHERE type = ANY(%s)
+        ) AS ranked WHERE position <= 8 OR type = ANY(%s)
+        """,
+        (["new", "top"], ["top"]),
+    ),
+    (
+        "screenshot manifest join",
+        """
+        SELECT t.name FROM ai_tools t
+        LEFT JOIN screenshot_manifest m ON m.tool_id = t.id
+        WHERE t.source = %s AND m.file_exists IS NOT TRUE
+        """,
+        ("FutureTools.io",),
+    ),
+    (
+        "full-text search (title candidates)",
+        "SELECT id FROM ai_tools WHERE search_title @@ to_tsquery('english', %s) LIMIT 501",
+        ("image & gen:*",),
+    ),
+    (
+        "full-text search (description candidates)",
+        "SELECT id FROM ai_tools WHERE search_vector @@ to_tsquery('english', %s) LIMIT 501",
+        ("image & gen:*",),
+    ),
+    (
+        "screenshot lookup",
+        "SELECT id FROM ai_tools WHERE screenshot_url = %s",
+        ("/static/screenshots/chatgpt.png",),
+    ),
+]
+
+
+def migrate(conn):
+    """
+    Apply pending migrations in order, each in its own transaction.
+
+    A failing migration is rolled back and raised; the ones before it stay
+    applied, so the next run resumes at the failed one.
+
+    Args:
+        conn: psycopg2 connection (committed per migration)
+
+    Returns:
+        list: Versions applied by this call (empty if already up to date)
+    """
+    cur = conn.cursor()
+    try:
+        # Session-level, so it is held across the per-migration commits
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+            """
+        )
+        cur.execute("SELECT version FROM schema_migrations")
+        applied = {row[0] for row in cur.fetchall()}
+        conn.commit()
+
+        newly_applied = []
+        for version, description, ddl in MIGRATIONS:
+            if version in applied:
+                continue
+            try:
+                cur.execute(ddl)
+                cur.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                    (version, description),
+                )
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise RuntimeError(f"Migration {version} ({description}) failed: {e}") from e
+            newly_applied.append(version)
+        return newly_applied
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        try:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+            conn.commit()
+        except psycopg2.Error:
+            pass  # The lock goes with the connection
+        cur.close()
+
+
+def run_migrations():
+    """
+    Connect with the DB_* environment settings and apply pending migrations.
+    """
+    conn = psycopg2.connect(**db_config())
+    try:
+        applied = migrate(conn)
+    finally:
+        conn.close()
+    if applied:
+        print(f"[INFO] Applied schema migrations: {', '.join(str(v) for v in applied)}")
+    return applied
+
+
+def dedupe_tools(conn):
+    """
+    Delete every ai_tools row that shares its (name, source) with a newer
+    one, printing each, so migration 3 can add its unique index.
+
+    Args:
+        conn: psycopg2 connection (committed on success, rolled back on error)
+
+    Returns:
+        list: (id, name, source, source_url) of the deleted rows
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            """
+            DELETE FROM ai_tools WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, max(id) OVER (PARTITION BY name, source) AS newest
+                    FROM ai_tools WHERE name IS NOT NULL AND source IS NOT NULL
+                ) AS tools
+                WHERE id <> newest
+            )
+            RETURNING id, name, source, source_url
+            """
+        )
+        deleted = sorted(cur.fetchall(), key=lambda row: (row[1], row[2], row[0]))
+        # --dedupe-tools runs before migrating, possibly on a database without catalog_version yet
+        cur.execute("SELECT to_regclass('catalog_version')")
+        if deleted and cur.fetchone()[0] is not None:
+            bump_catalog_version(cur)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    for tool_id, name, source, source_url in deleted:
+        print(f"[INFO] Deleted duplicate tool {tool_id}: {name} ({source}) {source_url}")
+    print(f"[INFO] Deleted {len(deleted)} duplicate tools")
+    return deleted
+
+
+def explain_hot_queries():
+    conn = psycopg2.connect(**db_config())
+    cur = conn.cursor()
+    cur.execute("ANALYZE ai_tools")
+    for label, query, params in EXPLAIN_QUERIES:
+        cur.execute("EXPLAIN ANALYZE " + query, params)
+        plan = "\n".join(f"    {row[0]}" for row in cur.fetchall())
+        print(f"=== {label} ===\n{plan}\n")
+    cur.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Apply ToolCurator schema migrations")
+    parser.add_argument("--explain", action="store_true", help="EXPLAIN ANALYZE the hot queries after migrating")
+    parser.add_argument("--dedupe-tools", action="store_true",
+                        help="delete older ai_tools rows sharing a (name, source), listing each, before migrating")
+    args = parser.parse_args()
+
+    if args.dedupe_tools:
+        conn = psycopg2.connect(**db_config())
+        try:
+            dedupe_tools(conn)
+        finally:
+            conn.close()
+    run_migrations()
+    if args.explain:
+        explain_hot_queries()
@@ -0,0 +1,123 @@
+import os
+import random
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from backend.http_client import RateLimiter, http_get
+from backend.screenshot_store import content_path, store_image
+from backend.screenshot_variants import generate_variants
+
+# Overridable so the engine can be pointed at a local stub server
+SCREENSHOT_API_URL = os.getenv("SCREENSHOTONE_API_URL", "https://api.screenshotone.com/take")
+
+SCREENSHOT_WORKERS = int(os.getenv("SCREENSHOT_WORKERS", "8"))
+# Requests per second allowed against the screenshot API, and against any one target site
+SCREENSHOT_API_RATE = float(os.getenv("SCREENSHOT_API_RATE", "4"))
+SCREENSHOT_TARGET_RATE = float(os.getenv("SCREENSHOT_TARGET_RATE", "1"))
+SCREENSHOT_MAX_ATTEMPTS = int(os.getenv("SCREENSHOT_MAX_ATTEMPTS", "4"))
+SCREENSHOT_TIMEOUT = (5, 60)  # (connect, read) seconds; captures take a while
+
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+api_limiter = RateLimiter(SCREENSHOT_API_RATE, burst=max(1, int(SCREENSHOT_API_RATE)))
+target_limiter = RateLimiter(SCREENSHOT_TARGET_RATE)
+
+def backoff_delay(attempt, retry_after=None):
+    """
+    Exponential backoff with full jitter, honoring a numeric Retry-After.
+    """
+    if retry_after:
+        try:
+            return min(BACKOFF_CAP, float(retry_after))
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def capture_screenshot(url, name):
+    """
+    Capture and save a screenshot for a tool, retrying transient failures.
+
+    Args:
+        url (str): URL of the tool
+        name (str): Name of the tool
+
+    Returns:
+        tuple: (screenshot path like "/static/screenshots/<sha256>.png" or None, error message or None)
+    """
+    if not url or url.strip() == "":
+        return None, "No URL provided"
+
+    params = {
+        "access_key": os.getenv("SCREENSHOTONE_API_KEY"),
+        "url": url,
+        "viewport_width": 1280,
+        "viewport_height": 800,
+        "format": "png",
+    }
+    api_host = urllib.parse.urlsplit(SCREENSHOT_API_URL).netloc
+    target_host = urllib.parse.urlsplit(url).netloc
+
+    error = None
+    for attempt in range(SCREENSHOT_MAX_ATTEMPTS):
+        target_limiter.acquire(target_host)
+        api_limiter.acquire(api_host)
+        retry_after = None
+        try:
+            # retries=0: this loop owns retries, so they also pass through the rate limiters
+            response = http_get(SCREENSHOT_API_URL, params=params, timeout=SCREENSHOT_TIMEOUT, retries=0)
+            if response.status_code == 200:
+                path, digest, created = store_image(response.content)
+                if created:
+                    try:
+                        generate_variants(content_path(digest))
+                    except Exception as e:
+                        # The original is usable on its own; variants can be backfilled
+                        print(f"❌ Failed to generate variants for {name}: {e}")
+                return path, None
+
+            error = f"HTTP {response.status_code}"
+            if response.status_code not in RETRY_STATUSES:
+                return None, error
+            retry_after = response.headers.get("Retry-After")
+        except requests.RequestException as e:
+            error = str(e)
+        except Exception as e:
+            # Undecodable image or disk error: retrying won't help
+            return None, str(e)
+
+        if attempt + 1 < SCREENSHOT_MAX_ATTEMPTS:
+            time.sleep(backoff_delay(attempt, retry_after))
+
+    return None, error
+
+
+def capture_many(tools, workers=SCREENSHOT_WORKERS):
+    """
+    Capture screenshots for many tools on a bounded thread pool.
+
+    Args:
+        tools (list): (name, url) pairs
+        workers (int): Maximum concurrent captures
+
+    Returns:
+        list: (name, url, screenshot path or None, error or None) in input order
+    """
+    def capture(tool):
+        name, url = tool
+        print(f"Generating screenshot for {name} ({url})...")
+        path, error = capture_screenshot(url, name)
+        if path:
+            print(f"🖼️ Saved Screenshot: {path}")
+        else:
+            print(f"❌ Failed to generate screenshot for {name}: {error}")
+        return name, url, path, error
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(capture, tools))
@@ -0,0 +1,332 @@
+"""
+Content-addressed screenshot storage.
+
+Screenshots are stored as ``<sha256>.png`` in static/screenshots, so a URL
+never changes meaning (it can be cached forever) and identical images are
+kept once. The screenshot_manifest table maps each tool (by ai_tools.id,
+so same-name tools of different sources don't share a row) to the hash of
+its current image and records the file's size, capture time and the last
+capture error. Writers update it as they capture, so finding tools without
+a screenshot is a single indexed query; --sync reconciles it with the disk.
+
+Usage:
+    python -m backend.screenshot_store --import-legacy   # move name-based files to hashed ones
+    python -m backend.screenshot_store --sync            # re-check manifest rows against the disk
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+import threading
+from io import BytesIO
+
+import psycopg2
+from PIL import Image
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+# Make the project root importable when run as a script (python backend/screenshot_store.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.catalog_version import bump_catalog_version
+from backend.db_pool import db_config
+from backend.screenshot_variants import SCREENSHOTS_DIR, generate_variants
+from backend.tool_queries import DISPLAYED_PER_SOURCE, displayed_tools_query
+
+PUBLIC_PREFIX = "/static/screenshots/"
+
+# A hashed original or any of its variants, relative to static/screenshots
+CONTENT_NAME_RE = re.compile(r"^(?:variants/)?(?P<hash>[0-9a-f]{64})(?:-\d+w)?\.(?:png|webp)$")
+
+
+def content_path(digest):
+    return os.path.join(SCREENSHOTS_DIR, f"{digest}.png")
+
+
+def content_url(digest):
+    return f"{PUBLIC_PREFIX}{digest}.png"
+
+
+def digest_from_url(screenshot_url):
+    """
+    Returns:
+        str or None: The content hash of a hashed screenshot URL/path
+    """
+    match = CONTENT_NAME_RE.match(os.path.basename(screenshot_url or ""))
+    return match["hash"] if match else None
+
+
+def is_immutable(filename):
+    """True for hashed screenshots and their variants (content never changes)."""
+    return CONTENT_NAME_RE.match(filename) is not None
+
+
+def store_image(content):
+    """
+    Normalize image bytes to PNG and store them under their content hash.
+
+    Args:
+        content (bytes): Image in any format Pillow can read
+
+    Returns:
+        tuple: (public path like "/static/screenshots/<hash>.png", hash, created)
+               where ``created`` is False if an identical image was already stored
+    """
+    with Image.open(BytesIO(content)) as img:
+        buffer = BytesIO()
+        img.save(buffer, "PNG")
+    data = buffer.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+
+    path = content_path(digest)
+    created = not os.path.exists(path)
+    if created:
+        os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
+        # Write then rename so readers (and concurrent writers of the same image) never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return content_url(digest), digest, created
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def _local_path(screenshot_url):
+    """
+    Returns:
+        str or None: File behind a /static/screenshots/ URL, None for remote ones
+    """
+    if not (screenshot_url or "").startswith(PUBLIC_PREFIX):
+        return None
+    return os.path.join(SCREENSHOTS_DIR, os.path.basename(screenshot_url))
+
+
+def record_screenshots(cur, screenshots):
+    """
+    Point tools at their new images, inside the caller's transaction.
+
+    Args:
+        cur: Cursor on the writer's connection
+        screenshots (list): (ai_tools id, hashed screenshot path) pairs
+    """
+    rows = {}
+    for tool_id, path in screenshots:
+        digest = digest_from_url(path)
+        if digest:
+            size = _file_size(content_path(digest))
+            rows[tool_id] = (digest, bool(size), size)
+    if not rows:
+        return
+    execute_values(
+        cur,
+        """
+        INSERT INTO screenshot_manifest
+            (tool_id, content_hash, file_exists, size_bytes, captured_at, last_attempt_at, last_error, updated_at)
+        VALUES %s
+        ON CONFLICT (tool_id) DO UPDATE
+        SET content_hash = EXCLUDED.content_hash, file_exists = EXCLUDED.file_exists,
+            size_bytes = EXCLUDED.size_bytes, captured_at = NOW(), last_attempt_at = NOW(),
+            last_error = NULL, updated_at = NOW()
+        """,
+        [(tool_id, *values) for tool_id, values in rows.items()],
+        template="(%s, %s, %s, %s, NOW(), NOW(), NULL, NOW())",
+    )
+
+
+def record_failures(cur, failures):
+    """
+    Record failed captures; a previously captured image stays in place.
+
+    Args:
+        cur: Cursor on the writer's connection
+        failures (list): (ai_tools id, error message) pairs
+    """
+    rows = dict(failures)
+    if not rows:
+        return
+    execute_values(
+        cur,
+        """
+        INSERT INTO screenshot_manifest (tool_id, last_attempt_at, last_error, updated_at) VALUES %s
+        ON CONFLICT (tool_id) DO UPDATE
+        SET last_attempt_at = NOW(), last_error = EXCLUDED.last_error, updated_at = NOW()
+        """,
+        list(rows.items()),
+        template="(%s, NOW(), %s, NOW())",
+    )
+
+
+def sync_manifest(conn):
+    """
+    Re-check every manifest row against the disk, and add rows for tools
+    whose local screenshot file the manifest doesn't know about.
+
+    Returns:
+        tuple: (rows changed, rows added)
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            """
+            SELECT t.id, t.screenshot_url, m.tool_id IS NOT NULL, m.content_hash, m.file_exists, m.size_bytes
+            FROM ai_tools t LEFT JOIN screenshot_manifest m ON m.tool_id = t.id
+            """
+        )
+        changed = []
+        added = []
+        for tool_id, screenshot_url, known, digest, file_exists, size_bytes in cur.fetchall():
+            if known:
+                path = content_path(digest) if digest else _local_path(screenshot_url)
+                size = _file_size(path) if path else None
+                if (bool(size), size) != (file_exists, size_bytes):
+                    changed.append((tool_id, bool(size), size))
+                continue
+            path = _local_path(screenshot_url)
+            if path and os.path.isfile(path):
+                size, mtime = _file_size(path), os.path.getmtime(path)
+                added.append((tool_id, digest_from_url(screenshot_url), bool(size), size, mtime, mtime))
+
+        if changed:
+            execute_values(
+                cur,
+                """
+                UPDATE screenshot_manifest
+                SET file_exists = v.file_exists, size_bytes = v.size_bytes, updated_at = NOW()
+                FROM (VALUES %s) AS v (tool_id, file_exists, size_bytes)
+                WHERE screenshot_manifest.tool_id = v.tool_id
+                """,
+                changed,
+                template="(%s, %s, %s::bigint)",
+            )
+        if added:
+            execute_values(
+                cur,
+                """
+                INSERT INTO screenshot_manifest
+                    (tool_id, content_hash, file_exists, size_bytes, captured_at, last_attempt_at)
+                VALUES %s ON CONFLICT (tool_id) DO NOTHING
+                """,
+                added,
+                template="(%s, %s, %s, %s, to_timestamp(%s), to_timestamp(%s))",
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    return len(changed), len(added)
+
+
+def tools_missing_screenshots(cur, sources=None, per_source=DISPLAYED_PER_SOURCE):
+    """
+    Displayed tools (see tool_queries.displayed_tools_query) whose own
+    screenshot is missing: no manifest row, no file on disk, or a
+    screenshot_url that no longer points at the manifest's image (e.g. the
+    row was re-imported), so the card would show none.
+
+    Returns:
+        list: (id, name, source_url) tuples in display order
+    """
+    displayed, params = displayed_tools_query(("name", "source_url", "screenshot_url"), per_source, sources)
+    query = sql.SQL(
+        "SELECT d.id, d.name, d.source_url FROM ({displayed}) AS d "
+        "LEFT JOIN screenshot_manifest m ON m.tool_id = d.id "
+        "WHERE m.file_exists IS NOT TRUE "
+        "OR (m.content_hash IS NOT NULL AND d.screenshot_url IS DISTINCT FROM {prefix} || m.content_hash || '.png')"
+    ).format(displayed=displayed, prefix=sql.Literal(PUBLIC_PREFIX))
+    cur.execute(query, params)
+    return cur.fetchall()
+
+
+def import_legacy_screenshots(conn):
+    """
+    Re-store every name-based screenshot (e.g. "adobe.png") under its hash,
+    repoint ai_tools rows that used the old path and record them in the
+    manifest. The old files are left in place for anything still linking to them.
+
+    Returns:
+        tuple: (files imported, distinct images stored)
+    """
+    legacy_files = sorted(
+        name for name in os.listdir(SCREENSHOTS_DIR)
+        if name.lower().endswith(".png") and not is_immutable(name)
+        and os.path.isfile(os.path.join(SCREENSHOTS_DIR, name))
+    )
+
+    repoints = []
+    digests = set()
+    for filename in legacy_files:
+        try:
+            with open(os.path.join(SCREENSHOTS_DIR, filename), "rb") as f:
+                path, digest, created = store_image(f.read())
+        except Exception as e:
+            print(f"❌ Failed to import {filename}: {e}")
+            continue
+        if created:
+            generate_variants(content_path(digest))
+        digests.add(digest)
+        repoints.append((f"{PUBLIC_PREFIX}{filename}", path))
+
+    cur = conn.cursor()
+    try:
+        if repoints:
+            # Each tool that used a legacy file gets its own manifest row for the hashed copy
+            screenshots = execute_values(
+                cur,
+                """
+                UPDATE ai_tools SET screenshot_url = v.new_url
+                FROM (VALUES %s) AS v (old_url, new_url)
+                WHERE ai_tools.screenshot_url = v.old_url
+                RETURNING ai_tools.id, ai_tools.screenshot_url
+                """,
+                repoints,
+                fetch=True,
+            )
+            record_screenshots(cur, screenshots)
+            bump_catalog_version(cur)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    return len(repoints), len(digests)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    from backend.schema import run_migrations
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Content-addressed screenshot storage")
+    parser.add_argument("--import-legacy", action="store_true", help="hash and record existing name-based screenshots")
+    parser.add_argument("--sync", action="store_true", help="re-check the screenshot manifest against the disk")
+    args = parser.parse_args()
+
+    if not (args.import_legacy or args.sync):
+        parser.print_help()
+        sys.exit(0)
+
+    run_migrations()
+    conn = psycopg2.connect(**db_config())
+    try:
+        if args.import_legacy:
+            imported, stored = import_legacy_screenshots(conn)
+            print(f"Imported {imported} screenshots as {stored} distinct images")
+        if args.sync:
+            changed, added = sync_manifest(conn)
+            print(f"Manifest sync: {changed} rows updated, {added} tools' files added")
+    finally:
+        conn.close()
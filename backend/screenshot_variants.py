@@ -0,0 +1,142 @@
+import argparse
+import os
+import re
+
+from PIL import Image
+
+SCREENSHOTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "screenshots")
+# Resized copies live under the originals so serve_screenshot() serves them as-is
+VARIANTS_DIR = os.path.join(SCREENSHOTS_DIR, "variants")
+VARIANT_WIDTHS = (320, 640, 1280)
+VARIANT_FORMATS = ("webp", "png")
+WEBP_QUALITY = 80
+
+VARIANT_NAME_RE = re.compile(r"^(?P<stem>[^/\\]+)-(?P<width>\d+)w\.(?P<fmt>webp|png)$")
+
+
+def variant_filename(filename, width, fmt):
+    stem = os.path.splitext(filename)[0]
+    return f"{stem}-{width}w.{fmt}"
+
+
+def generate_variants(src_path, force=False):
+    """
+    Write WebP and optimized PNG copies of a screenshot at each VARIANT_WIDTHS.
+
+    No PNG is written at (or above) the source width - the original already
+    is that variant. Variants newer than the source are left alone unless
+    ``force`` is set.
+
+    Args:
+        src_path (str): Path of the full-size screenshot
+        force (bool): Regenerate even if variants are up to date
+
+    Returns:
+        int: Number of variant files written
+    """
+    filename = os.path.basename(src_path)
+    src_mtime = os.path.getmtime(src_path)
+    os.makedirs(VARIANTS_DIR, exist_ok=True)
+
+    written = 0
+    with Image.open(src_path) as img:
+        img = img.convert("RGB")
+        for width in VARIANT_WIDTHS:
+            height = round(img.height * min(1.0, width / img.width))
+            resized = None
+            for fmt in VARIANT_FORMATS:
+                if fmt == "png" and width >= img.width:
+                    continue
+                out_path = os.path.join(VARIANTS_DIR, variant_filename(filename, width, fmt))
+                if not force and os.path.exists(out_path) and os.path.getmtime(out_path) >= src_mtime:
+                    continue
+                if resized is None:
+                    resized = img if width >= img.width else img.resize((width, height), Image.LANCZOS)
+                if fmt == "webp":
+                    resized.save(out_path, "WEBP", quality=WEBP_QUALITY, method=6)
+                else:
+                    resized.save(out_path, "PNG", optimize=True)
+                written += 1
+    return written
+
+
+def variant_source(variant_name):
+    """
+    Name of the original a variant file name is derived from.
+
+    Args:
+        variant_name (str): Requested file name inside VARIANTS_DIR
+
+    Returns:
+        str or None: "<stem>.png" in SCREENSHOTS_DIR, or None unless the name
+        is a known width of a plain file name (no directories, no "..")
+    """
+    match = VARIANT_NAME_RE.match(variant_name)
+    if not match or int(match["width"]) not in VARIANT_WIDTHS:
+        return None
+    stem = match["stem"]
+    if os.path.basename(stem) != stem or ".." in stem or "/" in stem or "\\" in stem:
+        return None
+    return f"{stem}.png"
+
+
+def srcsets_for(screenshot_url, base_url):
+    """
+    Build the HTML srcsets for a stored screenshot path (one stat per call).
+
+    Args:
+        screenshot_url (str): Path stored in ai_tools, e.g. "/static/screenshots/x.png"
+        base_url (str): Public URL prefix of the screenshots directory
+
+    Returns:
+        tuple: (WebP srcset, PNG srcset) as "url 320w, url 640w, ...", or
+        (None, None) for non-local screenshots
+    """
+    filename = os.path.basename(screenshot_url)
+    if not filename.lower().endswith(".png") or not os.path.isfile(os.path.join(SCREENSHOTS_DIR, filename)):
+        return None, None
+    srcsets = []
+    for fmt in VARIANT_FORMATS:
+        entries = []
+        for width in VARIANT_WIDTHS:
+            if fmt == "png" and width == VARIANT_WIDTHS[-1]:
+                # The full-size original stands in for the largest PNG
+                entries.append(f"{base_url}/{filename} {width}w")
+            else:
+                entries.append(f"{base_url}/variants/{variant_filename(filename, width, fmt)} {width}w")
+        srcsets.append(", ".join(entries))
+    return tuple(srcsets)
+
+
+def backfill(force=False):
+    """
+    Generate variants for every screenshot already on disk.
+    """
+    originals = sorted(
+        name for name in os.listdir(SCREENSHOTS_DIR)
+        if name.lower().endswith(".png") and os.path.isfile(os.path.join(SCREENSHOTS_DIR, name))
+    )
+    total_written = 0
+    for name in originals:
+        try:
+            written = generate_variants(os.path.join(SCREENSHOTS_DIR, name), force=force)
+        except Exception as e:
+            print(f"❌ Failed to generate variants for {name}: {e}")
+            continue
+        total_written += written
+        if written:
+            print(f"🖼️ {name}: wrote {written} variants")
+    print(f"Processed {len(originals)} screenshots, wrote {total_written} variant files")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate resized WebP/PNG screenshot variants")
+    parser.add_argument("--backfill", action="store_true", help="process every existing screenshot")
+    parser.add_argument("--force", action="store_true", help="regenerate variants that are up to date")
+    parser.add_argument("files", nargs="*", help="specific screenshot files to process")
+    args = parser.parse_args()
+
+    if args.backfill:
+        backfill(force=args.force)
+    for path in args.files:
+        print(f"{path}: wrote {generate_variants(path, force=args.force)} variants")
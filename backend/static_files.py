@@ -0,0 +1,212 @@
+"""
+Static serving for screenshots, kept off the API's request path.
+
+An in-memory index holds each file's size, ETag and Last-Modified, so a
+request costs no hashing and (for hash-named files) no stat. Conditional
+requests (If-None-Match / If-Modified-Since) and byte ranges are handled
+here, file bodies go out through wsgi.file_wrapper (sendfile under
+gunicorn), and with STATIC_OFFLOAD set the body is handed to the front
+proxy instead:
+
+    STATIC_OFFLOAD=x-accel     nginx: X-Accel-Redirect to STATIC_ACCEL_PREFIX/<file>
+    STATIC_OFFLOAD=x-sendfile  Apache / lighttpd: X-Sendfile with the absolute path
+
+The blueprint is registered on the API app, and static_app serves it alone
+so screenshots can run in their own process:
+
+    gunicorn backend.static_files:static_app
+"""
+import mimetypes
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import Blueprint, Flask, abort, redirect, request
+from werkzeug.security import safe_join
+from werkzeug.wsgi import wrap_file
+
+# Make the project root importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.screenshot_store import is_immutable
+from backend.screenshot_variants import SCREENSHOTS_DIR, variant_source
+
+STATIC_OFFLOAD = os.getenv("STATIC_OFFLOAD", "").lower()
+# nginx "internal" location aliased to the screenshots directory
+STATIC_ACCEL_PREFIX = os.getenv("STATIC_ACCEL_PREFIX", "/_protected/screenshots").rstrip("/")
+# Seconds before a name-based (mutable) file is stat'ed again
+STATIC_INDEX_TTL = float(os.getenv("STATIC_INDEX_TTL", "10"))
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class StaticEntry:
+    __slots__ = ("path", "size", "etag", "last_modified", "mimetype", "immutable", "checked_at")
+
+    def __init__(self, relpath, path, stat):
+        self.path = path
+        self.size = stat.st_size
+        self.last_modified = datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc)
+        self.immutable = is_immutable(relpath)
+        # Hash-named files are their own validator; others use mtime + size, like nginx
+        self.etag = os.path.basename(relpath) if self.immutable else f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+        self.mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.checked_at = time.monotonic()
+
+
+class StaticIndex:
+    """
+    relpath -> StaticEntry for one directory tree, filled by an initial scan
+    and then on demand. Mutable entries are re-stat'ed after ``ttl`` seconds.
+    """
+
+    def __init__(self, root, ttl=STATIC_INDEX_TTL):
+        self.root = root
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._scanned = False
+        self.hits = 0
+        self.misses = 0
+
+    def scan(self):
+        entries = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                relpath = os.path.relpath(path, self.root).replace(os.sep, "/")
+                try:
+                    entries[relpath] = StaticEntry(relpath, path, os.stat(path))
+                except OSError:
+                    continue
+        with self._lock:
+            self._entries = entries
+            self._scanned = True
+        return len(entries)
+
+    def lookup(self, relpath):
+        """
+        Returns:
+            StaticEntry or None: The file's entry, or None if it doesn't exist
+        """
+        if not self._scanned:
+            self.scan()
+
+        with self._lock:
+            entry = self._entries.get(relpath)
+        if entry is not None and (entry.immutable or time.monotonic() - entry.checked_at < self.ttl):
+            with self._lock:
+                self.hits += 1
+            return entry
+
+        path = safe_join(self.root, relpath)
+        try:
+            stat = os.stat(path) if path else None
+        except OSError:
+            stat = None
+
+        with self._lock:
+            self.misses += 1
+            if stat is None or not os.path.isfile(path):
+                self._entries.pop(relpath, None)
+                return None
+            entry = StaticEntry(relpath, path, stat)
+            self._entries[relpath] = entry
+            return entry
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "offload": STATIC_OFFLOAD or None,
+            }
+
+
+screenshot_index = StaticIndex(SCREENSHOTS_DIR)
+
+screenshots_bp = Blueprint("screenshots", __name__)
+
+
+def offload_response(response_class, entry, relpath, offload_prefix):
+    """
+    Response handing the body to the front proxy, or None when STATIC_OFFLOAD is off.
+    The proxy evaluates ranges and conditionals against the real file.
+    """
+    if STATIC_OFFLOAD == "x-accel":
+        response = response_class(mimetype=entry.mimetype)
+        response.headers["X-Accel-Redirect"] = f"{offload_prefix}/{relpath}"
+        return response
+    if STATIC_OFFLOAD == "x-sendfile":
+        response = response_class(mimetype=entry.mimetype)
+        response.headers["X-Sendfile"] = entry.path
+        return response
+    return None
+
+
+def set_validators(response, entry):
+    response.set_etag(entry.etag)
+    response.last_modified = entry.last_modified
+    # Hash-named files never change content, so caches never need to revalidate
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if entry.immutable else "no-cache"
+    return response
+
+
+def send_indexed(index, relpath, offload_prefix):
+    """
+    Build a conditional, range-aware response for a file in ``index``.
+
+    Args:
+        index (StaticIndex): Index of the directory to serve from
+        relpath (str): Requested path relative to the index root
+        offload_prefix (str): Internal proxy location for X-Accel-Redirect
+    """
+    entry = index.lookup(relpath)
+    if entry is None:
+        abort(404)
+
+    response = offload_response(Flask.response_class, entry, relpath, offload_prefix)
+    if response is not None:
+        return set_validators(response, entry)
+
+    # wsgi.file_wrapper lets gunicorn use sendfile() for the body
+    body = wrap_file(request.environ, open(entry.path, "rb"))
+    response = Flask.response_class(body, mimetype=entry.mimetype, direct_passthrough=True)
+    response.content_length = entry.size
+    set_validators(response, entry)
+    return response.make_conditional(request, accept_ranges=True, complete_length=entry.size)
+
+
+def variant_fallback(filename):
+    """
+    For a variant not on disk yet whose original is an indexed screenshot,
+    the original's URL path; None for anything else (which 404s as is).
+
+    Variants are written by capture and by ``python -m
+    backend.screenshot_variants --backfill``, never on the request path.
+    """
+    if not filename.startswith("variants/"):
+        return None
+    source = variant_source(filename[len("variants/"):])
+    if source is None or screenshot_index.lookup(filename) is not None or screenshot_index.lookup(source) is None:
+        return None
+    return f"/static/screenshots/{source}"
+
+
+@screenshots_bp.route("/static/screenshots/<path:filename>")
+def serve_screenshot(filename):
+    # Resized variants missing from disk (not backfilled yet): send the client to the original
+    fallback = variant_fallback(filename)
+    if fallback is not None:
+        return redirect(fallback, 302)
+    return send_indexed(screenshot_index, filename, STATIC_ACCEL_PREFIX)
+
+
+# Standalone static server (no database, no migrations)
+static_app = Flask(__name__)
+static_app.register_blueprint(screenshots_bp)
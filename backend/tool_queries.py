@@ -0,0 +1,387 @@
+import base64
+import binascii
+import os
+import re
+
+from psycopg2 import sql
+
+from backend.screenshot_variants import srcsets_for
+
+# Columns of ai_tools exposed by /api/tools, in response order
+TOOL_FIELDS = (
+    "name",
+    "short_description",
+    "full_description",
+    "category",
+    "source",
+    "source_url",
+    "screenshot_url",
+    "type",
+)
+
+MAX_PAGE_SIZE = 100
+
+# What the homepage shows: the first N tools (by id) of each source, for each filter tab,
+# except the tabs it shows in full (the "top" carousel renders every tool it gets)
+DISPLAYED_TYPES = ("new", "top")
+DISPLAYED_PER_SOURCE = int(os.getenv("DISPLAYED_PER_SOURCE", "8"))
+DISPLAYED_UNCAPPED_TYPES = ("top",)
+
+# /api/tools/search: page size when no limit is given, and words used from q
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_TERMS = 8
+# Shorter trailing words match exactly; a one-letter prefix would match most of the catalog
+MIN_PREFIX_LENGTH = 2
+# Matches ranked per search, from each of search_title and search_vector (see search_query)
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "500"))
+
+_SEARCH_TERM_RE = re.compile(r"[^\W_]+")
+
+
+class InvalidQuery(ValueError):
+    """Raised for malformed /api/tools query parameters (fields, limit, cursor)."""
+
+
+def parse_fields(value):
+    """
+    Parse a ``fields=`` projection into a tuple of known columns.
+
+    Args:
+        value (str or None): Comma-separated field names; empty means all fields
+
+    Returns:
+        tuple: Requested fields in canonical TOOL_FIELDS order
+    """
+    if not value:
+        return TOOL_FIELDS
+    requested = {field.strip() for field in value.split(",") if field.strip()}
+    unknown = requested.difference(TOOL_FIELDS)
+    if unknown:
+        raise InvalidQuery(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if not requested:
+        raise InvalidQuery("fields must name at least one field")
+    return tuple(field for field in TOOL_FIELDS if field in requested)
+
+
+def parse_limit(value):
+    if value is None or value == "":
+        return None
+    try:
+        limit = int(value)
+    except ValueError:
+        raise InvalidQuery("limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise InvalidQuery(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def encode_cursor(last_id, fell_back):
+    raw = f"{last_id}:{int(fell_back)}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Decode an opaque ``after=`` cursor.
+
+    Returns:
+        tuple: (last_id, fell_back)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id, fell_back = base64.urlsafe_b64decode(padded).decode("ascii").split(":")
+        return int(last_id), fell_back == "1"
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidQuery("Invalid cursor")
+
+
+def _tools_query(columns, type_filter, source_filter=None, after_id=None, limit=None, fell_back=False):
+    conditions = [sql.SQL("type = %s")]
+    params = [type_filter]
+    if source_filter is not None:
+        conditions.append(sql.SQL("source = %s"))
+        params.append(source_filter)
+    if after_id is not None:
+        conditions.append(sql.SQL("id > %s"))
+        params.append(after_id)
+
+    query = sql.SQL("SELECT id, {columns}, {fell_back} AS fell_back FROM ai_tools WHERE {conditions} ORDER BY id").format(
+        columns=sql.SQL(", ").join(sql.Identifier(column) for column in columns),
+        fell_back=sql.Literal(fell_back),
+        conditions=sql.SQL(" AND ").join(conditions),
+    )
+    if limit is not None:
+        query += sql.SQL(" LIMIT %s")
+        params.append(limit)
+    return query, params
+
+
+def _top_with_fallback_query(columns, type_filter, source_filter, limit=None):
+    # One statement: the source's own rows, or - only when there are none -
+    # the same type across all sources. NOT EXISTS on the CTE is evaluated
+    # once, so the fallback branch costs nothing when the source has rows.
+    scoped, scoped_params = _tools_query(columns, type_filter, source_filter, limit=limit)
+    fallback, fallback_params = _tools_query(columns, type_filter, limit=limit, fell_back=True)
+    query = sql.SQL(
+        "WITH scoped AS ({scoped}) "
+        "SELECT * FROM scoped "
+        "UNION ALL "
+        "SELECT * FROM ({fallback}) AS fallback WHERE NOT EXISTS (SELECT 1 FROM scoped) "
+        "ORDER BY id"
+    ).format(scoped=scoped, fallback=fallback)
+    return query, scoped_params + fallback_params
+
+
+def tools_page_query(source_filter, type_filter, columns=TOOL_FIELDS, limit=None, after=None):
+    """
+    Build the query for one page of tools (see fetch_tools).
+
+    Returns:
+        tuple: (query, params); rows are (id, *columns, fell_back)
+    """
+    after_id, fell_back = decode_cursor(after) if after else (None, False)
+    fetch_limit = limit + 1 if limit is not None else None
+
+    if source_filter and not fell_back:
+        if after_id is None and type_filter == 'top':
+            return _top_with_fallback_query(columns, type_filter, source_filter, fetch_limit)
+        return _tools_query(columns, type_filter, source_filter, after_id, fetch_limit)
+    return _tools_query(columns, type_filter, None, after_id, fetch_limit, fell_back)
+
+
+def tools_page(rows, limit=None, after=None):
+    """
+    Split the rows of a tools_page_query() into a page and its next cursor.
+
+    Returns:
+        tuple: (rows, next_cursor, fell_back) where each row is (id, *columns)
+    """
+    fell_back = decode_cursor(after)[1] if after else False
+    if rows:
+        fell_back = rows[0][-1]
+        rows = [tuple(row[:-1]) for row in rows]
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][0], fell_back)
+
+    return rows, next_cursor, fell_back
+
+
+def fetch_tools(cur, source_filter, type_filter, columns=TOOL_FIELDS, limit=None, after=None):
+    """
+    Fetch one page of tools ordered by id.
+
+    When a source has no "top" tools, top tools across all sources are
+    returned instead (in the same round trip); the cursor remembers that so
+    later pages stay on the fallback listing.
+
+    Args:
+        cur: Database cursor
+        source_filter (str or None): Source to restrict to
+        type_filter (str): Tool type ("new" or "top")
+        columns (tuple): Columns to select, from TOOL_FIELDS
+        limit (int or None): Page size; None returns everything
+        after (str or None): Cursor from a previous page's next_cursor
+
+    Returns:
+        tuple: (rows, next_cursor, fell_back) where each row is (id, *columns)
+    """
+    query, params = tools_page_query(source_filter, type_filter, columns, limit, after)
+    cur.execute(query, params)
+    return tools_page(cur.fetchall(), limit, after)
+
+
+def parse_search_query(value):
+    """
+    Turn free text into a to_tsquery() expression for type-ahead search:
+    every word must match and the last one may be a prefix ("image gen"
+    finds "Image Generator").
+
+    Args:
+        value (str or None): The raw ``q=`` parameter
+
+    Returns:
+        str: A tsquery expression such as ``image & gen:*``
+    """
+    terms = _SEARCH_TERM_RE.findall((value or "").lower())[:MAX_SEARCH_TERMS]
+    if not terms:
+        raise InvalidQuery("q must contain at least one word")
+    if len(terms[-1]) >= MIN_PREFIX_LENGTH:
+        terms[-1] += ":*"
+    return " & ".join(terms)
+
+
+def encode_search_cursor(rank, last_id):
+    raw = f"{rank!r}:{last_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_search_cursor(cursor):
+    """
+    Returns:
+        tuple: (rank, last_id) of the last result on the previous page
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, last_id = base64.urlsafe_b64decode(padded).decode("ascii").split(":")
+        return float(rank), int(last_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidQuery("Invalid cursor")
+
+
+def search_query(tsquery, columns=TOOL_FIELDS, limit=DEFAULT_SEARCH_LIMIT, after=None, candidates=SEARCH_CANDIDATES):
+    """
+    Build a ranked full-text search over ai_tools (schema migration 6), best
+    matches first, with keyset pagination on (rank, id).
+
+    Ranking every match of a common word ("ai") means reading most of the
+    table, so only a bounded candidate set is ranked: the first
+    ``candidates`` tools matching on name/summary/category (search_title),
+    plus - only when there are no more of those - the first ``candidates``
+    matching anywhere (search_vector). "First" is the order the index scan
+    returns them in, which is stable while the table doesn't change, so
+    every page of a query is drawn from the same set. Picking candidates by
+    rank or by id would mean visiting every match (100k tools: p95 over
+    40 ms instead of under 20 ms). Narrow queries are therefore ranked
+    exactly; broad ones are ranked among an arbitrary sample of their
+    matches and flagged as truncated.
+
+    Args:
+        tsquery (str): Expression from parse_search_query
+        columns (tuple): Columns to select, from TOOL_FIELDS
+        limit (int): Page size
+        after (str or None): Cursor from a previous page's next_cursor
+        candidates (int): Candidate cap per index
+
+    Returns:
+        tuple: (query, params); rows are (id, *columns, truncated, rank)
+    """
+    # One row past the cap tells a truncated candidate set from one that is exactly full
+    params = [tsquery, candidates + 1, tsquery, candidates, candidates + 1,
+              candidates, candidates, tsquery, candidates, candidates]
+    condition = sql.SQL("")
+    if after:
+        rank, last_id = decode_search_cursor(after)
+        # ts_rank is a real; compare at that precision so the cursor's own row is excluded
+        condition = sql.SQL("WHERE rank < %s::real OR (rank = %s::real AND id > %s) ")
+        params += [rank, rank, last_id]
+    params.append(limit + 1)
+
+    query = sql.SQL(
+        "WITH title AS ("
+        "SELECT id FROM ai_tools WHERE search_title @@ to_tsquery('english', %s) LIMIT %s"
+        "), body AS ("
+        "SELECT id FROM ai_tools WHERE search_vector @@ to_tsquery('english', %s) "
+        "AND (SELECT count(*) FROM title) <= %s LIMIT %s"
+        ") "
+        # float8 so both drivers hand back the same value for the cursor
+        "SELECT id, {columns}, truncated, rank::float8 FROM ("
+        "SELECT id, {columns}, "
+        "(SELECT count(*) FROM title) > %s OR (SELECT count(*) FROM body) > %s AS truncated, "
+        "ts_rank(search_vector, to_tsquery('english', %s)) AS rank "
+        "FROM ai_tools WHERE id IN ("
+        "(SELECT id FROM title LIMIT %s) UNION (SELECT id FROM body LIMIT %s)"
+        ")"
+        ") AS matches {condition}"
+        "ORDER BY rank DESC, id LIMIT %s"
+    ).format(
+        columns=sql.SQL(", ").join(sql.Identifier(column) for column in columns),
+        condition=condition,
+    )
+    return query, params
+
+
+def search_page(rows, limit):
+    """
+    Split the rows of a search_query() into a page and its next cursor.
+
+    Returns:
+        tuple: (rows, next_cursor, truncated) where each row is (id, *columns)
+        and truncated is True when the query had more matches than it ranks
+        (later pages stop at the candidate cap)
+    """
+    truncated = bool(rows) and bool(rows[0][-2])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_search_cursor(rows[-1][-1], rows[-1][0])
+    return [tuple(row[:-2]) for row in rows], next_cursor, truncated
+
+
+def displayed_tools_query(columns, per_source=DISPLAYED_PER_SOURCE, sources=None, types=DISPLAYED_TYPES,
+                          uncapped=DISPLAYED_UNCAPPED_TYPES):
+    """
+    Build the "displayed tools" query: the first ``per_source`` tools by id
+    for every (type, source), and every tool of the ``uncapped`` types, in
+    one windowed statement.
+
+    The ordering matches /api/tools (and so the homepage cards). The "new"
+    tab shows only its first ``per_source`` tools; the "top" tab (and the
+    mobile carousel) shows all of them, so "top" is uncapped. A source with
+    no "top" tools gets the top tools of every source, which are therefore
+    included as well (for the ``sources`` selected).
+
+    Args:
+        columns (tuple): Columns to select (id is always selected first)
+        per_source (int): Quota per (type, source)
+        sources (list or None): Sources to include; None means all
+        types (tuple): Tool types to include
+        uncapped (tuple): Types included in full, whatever ``per_source``
+
+    Returns:
+        tuple: (query, params) for rows of (id, *columns), ordered by type, source, id
+    """
+    conditions = [sql.SQL("type = ANY(%s)")]
+    params = [list(types)]
+    if sources is not None:
+        conditions.append(sql.SQL("source = ANY(%s)"))
+        params.append(list(sources))
+    params += [per_source, list(uncapped)]
+
+    # Partitioned in (type, source, id) order so ai_tools_type_source_id_idx feeds the window without a sort
+    query = sql.SQL(
+        "SELECT id, {columns} FROM ("
+        "SELECT id, {columns}, type AS _type, source AS _source, "
+        "ROW_NUMBER() OVER (PARTITION BY type, source ORDER BY id) AS _position "
+        "FROM ai_tools WHERE {conditions}"
+        ") AS ranked WHERE _position <= %s OR _type = ANY(%s) "
+        "ORDER BY _type, _source, id"
+    ).format(
+        columns=sql.SQL(", ").join(sql.Identifier(column) for column in columns),
+        conditions=sql.SQL(" AND ").join(conditions),
+    )
+    return query, params
+
+
+def fetch_displayed_tools(cur, columns=TOOL_FIELDS, per_source=DISPLAYED_PER_SOURCE, sources=None, types=DISPLAYED_TYPES,
+                          uncapped=DISPLAYED_UNCAPPED_TYPES):
+    """
+    Fetch the tools the homepage displays (see displayed_tools_query).
+
+    Returns:
+        list: Rows of (id, *columns)
+    """
+    query, params = displayed_tools_query(columns, per_source, sources, types, uncapped)
+    cur.execute(query, params)
+    return cur.fetchall()
+
+
+def screenshot_public_url(screenshot_url, host_url):
+    if not screenshot_url:
+        return "/default-screenshot.png"
+    return f"{host_url.rstrip('/')}/static/screenshots/{screenshot_url.replace('/static/screenshots/', '')}"
+
+
+def tool_to_dict(row, columns, host_url):
+    tool = dict(zip(columns, row[1:]))
+    if "screenshot_url" in tool:
+        stored_url = tool["screenshot_url"]
+        tool["screenshot_url"] = screenshot_public_url(stored_url, host_url)
+        # Resized WebP/PNG variants for <img srcset> / <picture>
+        base_url = f"{host_url.rstrip('/')}/static/screenshots"
+        tool["screenshot_srcset"], tool["screenshot_srcset_png"] = (
+            srcsets_for(stored_url, base_url) if stored_url else (None, None)
+        )
+    return tool
@@ -0,0 +1,46 @@
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+from backend.catalog_version import bump_catalog_version
+
+# Rows per multi-row INSERT statement
+DEFAULT_PAGE_SIZE = 100
+
+
+def write_tools(conn, columns, tools, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Insert scraped tools in page-sized multi-row statements and commit.
+
+    Rows that collide with an existing tool on any unique key (source_url,
+    or name + source) are skipped, so scrapers can re-submit what they saw.
+
+    Args:
+        conn: Database connection
+        columns (tuple): ai_tools columns, in the order of each tool tuple
+        tools (list): Tool tuples to insert
+        page_size (int): Rows per INSERT statement
+
+    Returns:
+        tuple: (inserted, skipped) row counts
+    """
+    tools = list(tools)
+    if not tools:
+        return 0, 0
+
+    query = sql.SQL("INSERT INTO ai_tools ({columns}) VALUES %s ON CONFLICT DO NOTHING RETURNING 1").format(
+        columns=sql.SQL(", ").join(sql.Identifier(column) for column in columns),
+    )
+
+    cur = conn.cursor()
+    try:
+        inserted = len(execute_values(cur, query, tools, page_size=page_size, fetch=True))
+        if inserted:
+            bump_catalog_version(cur)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    return inserted, len(tools) - inserted
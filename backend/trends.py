@@ -0,0 +1,239 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+from backend.http_client import http_get
+
+try:
+    import httpx
+except ImportError:  # only needed by the ASGI app (backend/asgi.py)
+    httpx = None
+
+# Overridable so the refresher can be pointed at a local stub server
+SERPAPI_URL = os.getenv("SERPAPI_URL", "https://serpapi.com/search")
+# Seconds between upstream fetches (each one is a billed SerpAPI search)
+TRENDS_REFRESH_INTERVAL = float(os.getenv("TRENDS_REFRESH_INTERVAL", "900"))
+# Extra seconds an expired snapshot may be served while a refresh runs
+TRENDS_STALE_WHILE_REVALIDATE = float(os.getenv("TRENDS_STALE_WHILE_REVALIDATE", "300"))
+# Minimum seconds between upstream attempts, so a failing upstream isn't hammered
+TRENDS_RETRY_INTERVAL = float(os.getenv("TRENDS_RETRY_INTERVAL", "60"))
+TRENDS_LIMIT = 5
+
+
+class TrendsUnavailable(Exception):
+    """Raised when SerpAPI returned no usable trends."""
+
+
+def _serpapi_params():
+    return {
+        "engine": "google_trends",
+        "trend_type": "daily",
+        "geo": "US",
+        "api_key": os.getenv("SERPAPI_KEY"),
+    }
+
+
+def _parse_trends(status_code, data):
+    if "trending_searches" not in data:
+        raise TrendsUnavailable(data.get("error", f"HTTP {status_code}, no trending_searches"))
+
+    # Extract top trending searches (no AI filter)
+    return [trend["title"] for trend in data["trending_searches"]][:TRENDS_LIMIT]
+
+
+def fetch_trending_topics():
+    """
+    Fetch today's top US Google Trends searches from SerpAPI.
+
+    Returns:
+        list: Up to TRENDS_LIMIT trending search titles
+    """
+    response = http_get(SERPAPI_URL, params=_serpapi_params(), timeout=(5, 15))
+    return _parse_trends(response.status_code, response.json())
+
+
+async def fetch_trending_topics_async(client):
+    """
+    fetch_trending_topics() over an httpx.AsyncClient.
+    """
+    response = await client.get(SERPAPI_URL, params=_serpapi_params(), timeout=httpx.Timeout(15, connect=5))
+    return _parse_trends(response.status_code, response.json())
+
+
+class TrendsCache:
+    """
+    Last good trends snapshot, refreshed by a background thread every
+    ``refresh_interval`` seconds.
+
+    Requests are served from memory. An expired snapshot is still served for
+    ``stale_while_revalidate`` seconds while the refresher is woken; past
+    that (or on a cold start) the request tries the upstream itself. When the
+    upstream fails the last good snapshot is served regardless of age.
+    """
+
+    def __init__(self, fetch=fetch_trending_topics, refresh_interval=TRENDS_REFRESH_INTERVAL,
+                 stale_while_revalidate=TRENDS_STALE_WHILE_REVALIDATE, retry_interval=TRENDS_RETRY_INTERVAL):
+        self.fetch = fetch
+        self.refresh_interval = refresh_interval
+        self.stale_while_revalidate = stale_while_revalidate
+        self.retry_interval = retry_interval
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # single flight
+        self._wake = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+
+        self._trends = None
+        self._fetched_at = None
+        self._attempted_at = 0.0
+        self._last_error = None
+        self._refreshes = 0
+        self._failures = 0
+
+    def start(self):
+        # Threads don't survive a fork, so each gunicorn worker starts its own
+        with self._lock:
+            if self._thread_pid == os.getpid() and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="trends-refresher", daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self.refresh(self.retry_interval)
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+
+    def refresh(self, min_interval=0):
+        """
+        Fetch from upstream and replace the snapshot; on failure keep the old one.
+
+        Args:
+            min_interval (float): Skip if another attempt finished less than this many seconds ago
+
+        Returns:
+            bool: True if the snapshot was replaced
+        """
+        with self._refresh_lock:
+            if time.time() - self._attempted_at < min_interval:
+                return False
+            try:
+                trends = self.fetch()
+            except Exception as e:
+                self._record_failure(e)
+                return False
+            self._record_success(trends)
+            return True
+
+    def _record_success(self, trends):
+        self._attempted_at = time.time()
+        with self._lock:
+            self._trends = trends
+            self._fetched_at = time.time()
+            self._last_error = None
+            self._refreshes += 1
+
+    def _record_failure(self, error):
+        self._attempted_at = time.time()
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error)
+        print("❌ Trends refresh failed:", str(error), file=sys.stderr, flush=True)
+
+    def _snapshot(self):
+        """
+        Returns:
+            tuple: (trends or None, age in seconds or None, last error or None)
+        """
+        with self._lock:
+            age = time.time() - self._fetched_at if self._fetched_at else None
+            return self._trends, age, self._last_error
+
+    def _must_fetch(self, age):
+        # Cold start, or too stale to serve without trying the upstream first
+        return age is None or age > self.refresh_interval + self.stale_while_revalidate
+
+    def get(self):
+        """
+        Returns:
+            tuple: (trends or None, age in seconds or None, last error or None)
+        """
+        self.start()
+        _, age, _ = self._snapshot()
+        if self._must_fetch(age):
+            # Wait for the refresher's fetch (or do it ourselves)
+            self.refresh(self.retry_interval)
+        elif age > self.refresh_interval:
+            # Within the stale-while-revalidate window: serve it, revalidate in the background
+            self._wake.set()
+        return self._snapshot()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "age_s": round(time.time() - self._fetched_at, 1) if self._fetched_at else None,
+                "refreshes": self._refreshes,
+                "failures": self._failures,
+                "last_error": self._last_error,
+                "refresh_interval_s": self.refresh_interval,
+            }
+
+
+class AsyncTrendsCache(TrendsCache):
+    """
+    TrendsCache for the ASGI app: the same policy, driven by an asyncio task
+    fetching through a shared httpx.AsyncClient. Must be used on one event loop.
+    """
+
+    def __init__(self, client, **kwargs):
+        super().__init__(fetch=None, **kwargs)
+        self.client = client
+        self._task = None
+        self._async_refresh_lock = asyncio.Lock()
+        self._async_wake = asyncio.Event()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        while True:
+            await self.refresh(self.retry_interval)
+            try:
+                await asyncio.wait_for(self._async_wake.wait(), self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._async_wake.clear()
+
+    async def refresh(self, min_interval=0):
+        async with self._async_refresh_lock:
+            if time.time() - self._attempted_at < min_interval:
+                return False
+            try:
+                trends = await fetch_trending_topics_async(self.client)
+            except Exception as e:
+                self._record_failure(e)
+                return False
+            self._record_success(trends)
+            return True
+
+    async def get(self):
+        self.start()
+        _, age, _ = self._snapshot()
+        if self._must_fetch(age):
+            await self.refresh(self.retry_interval)
+        elif age > self.refresh_interval:
+            self._async_wake.set()
+        return self._snapshot()
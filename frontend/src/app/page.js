@@ -35,6 +35,33 @@ const FILTERS = [
   { name: "Top Tools", id: "top" },
 ];
 
+// Only the fields the tool cards render (skips the long full_description)
+const CARD_FIELDS = "name,short_description,category,source_url,screenshot_url";
+
+// Tool screenshot: resized WebP (or PNG) variants via srcset, the full-size PNG as fallback.
+// screenshot_srcset / screenshot_srcset_png come with screenshot_url from /api/tools.
+function ToolScreenshot({ tool, sizes, className }) {
+  const src = tool?.screenshot_url && tool.screenshot_url.trim() !== ""
+    ? tool.screenshot_url
+    : "/default-screenshot.png";
+
+  return (
+    <picture>
+      {tool?.screenshot_srcset && <source type="image/webp" srcSet={tool.screenshot_srcset} sizes={sizes} />}
+      {tool?.screenshot_srcset_png && <source type="image/png" srcSet={tool.screenshot_srcset_png} sizes={sizes} />}
+      <img
+        src={src}
+        alt={`${tool?.name} Screenshot`}
+        width={1280}
+        height={800}
+        loading="lazy"
+        decoding="async"
+        className={className}
+      />
+    </picture>
+  );
+}
+
 export default function Home() {
   const [tools, setTools] = useState([]);
   const [selectedSource, setSelectedSource] = useState("FutureTools.io");
@@ -78,7 +105,7 @@ export default function Home() {
   }, []);
 
   useEffect(() => {
-    fetch(`${API_BASE_URL}/api/tools?source=${selectedSource}&filter=${selectedFilter}`)
+    fetch(`${API_BASE_URL}/api/tools?source=${selectedSource}&filter=${selectedFilter}&fields=${CARD_FIELDS}`)
       .then((response) => response.json())
       .then((data) => {
         // Slice to 8 tools if more than 8 and filter is 'new'
@@ -321,9 +348,9 @@ export default function Home() {
                       <span>⭐ Nik and Travis Certified!</span>
                     </div>
                   )}
-                  <img
-                    src={tools[currentSlide]?.screenshot_url || "/default-screenshot.png"}
-                    alt={`${tools[currentSlide]?.name} Screenshot`}
+                  <ToolScreenshot
+                    tool={tools[currentSlide]}
+                    sizes="100vw"
                     className="w-full h-auto rounded-lg mb-4"
                   />
                   <h3 className={`${inter.className} text-lg font-bold flex items-center justify-center`}>
@@ -370,10 +397,6 @@ export default function Home() {
           // Desktop Grid View with plain white cards and hover effect - UPDATED WITH CATEGORY
           <div className="grid grid-cols-1 md:grid-cols-4 gap-6">
             {tools.slice(0,8).map((tool, index) => {
-              const imageUrl = tool.screenshot_url && tool.screenshot_url.trim() !== ""
-                ? tool.screenshot_url
-                : "/default-screenshot.png";
-
               return (
                 <div
                   key={index}
@@ -385,13 +408,10 @@ export default function Home() {
                     </div>
                   )}
 
-                  <Image
-                    src={imageUrl}
-                    alt={`${tool.name} Screenshot`}
-                    width={1280}
-                    height={800}
+                  <ToolScreenshot
+                    tool={tool}
+                    sizes="(min-width: 768px) 25vw, 100vw"
                     className="w-full h-auto rounded-md shadow-sm mb-4"
-                    unoptimized
                   />
 
                   <h3 className={`${inter.className} text-lg font-bold flex items-center`}>
@@ -0,0 +1,132 @@
+"""
+Minimal HTTP/1.1 keep-alive load generator (stdlib only) for comparing the
+sync (gunicorn + Flask) and async (uvicorn + Quart) serving modes.
+
+    gunicorn -w 4 -b 127.0.0.1:5001 backend.app:app
+    uvicorn --port 5002 backend.asgi:app
+    python load_test.py http://127.0.0.1:5001/api/tools -c 200 -d 20
+    python load_test.py http://127.0.0.1:5002/api/tools -c 200 -d 20
+
+Pass several URLs (same host) to spread load across them, e.g. different
+cursors, to measure cache misses rather than cache hits.
+"""
+import argparse
+import asyncio
+import time
+import urllib.parse
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    length = None
+    chunked = False
+    close = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value:
+            chunked = True
+        elif name == "connection" and value == "close":
+            close = True
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status, close
+
+
+async def run(urls, concurrency, duration, timeout):
+    parts = urllib.parse.urlsplit(urls[0])
+    host, port = parts.hostname, parts.port or 80
+    requests = [
+        (
+            f"GET {urllib.parse.urlsplit(url).path or '/'}"
+            f"{'?' + urllib.parse.urlsplit(url).query if urllib.parse.urlsplit(url).query else ''} HTTP/1.1\r\n"
+            f"Host: {parts.netloc}\r\nAccept-Encoding: gzip, br\r\n\r\n"
+        ).encode("latin-1")
+        for url in urls
+    ]
+
+    latencies = []
+    statuses = {}
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset):
+        nonlocal errors
+        i = offset
+        reader = writer = None
+        while time.perf_counter() < deadline:
+            if writer is None:
+                try:
+                    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+                except (OSError, asyncio.TimeoutError):
+                    errors += 1
+                    await asyncio.sleep(0.05)
+                    continue
+            request = requests[i % len(requests)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                writer.write(request)
+                status, close = await asyncio.wait_for(_read_response(reader), timeout)
+            except (OSError, ConnectionError, ValueError, IndexError, asyncio.TimeoutError,
+                    asyncio.IncompleteReadError):
+                errors += 1
+                writer.close()
+                writer = None
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            if close:
+                writer.close()
+                writer = None
+        if writer is not None:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"URLs:        {len(urls)} ({urls[0]}{' ...' if len(urls) > 1 else ''})")
+    print(f"Concurrency: {concurrency}, duration: {elapsed:.1f}s")
+    print(f"Requests:    {len(latencies)} ok, {errors} errors, statuses {dict(sorted(statuses.items()))}")
+    print(f"Throughput:  {len(latencies) / elapsed:.0f} req/s")
+    print(
+        "Latency ms:  "
+        f"p50 {percentile(latencies, 0.5) * 1000:.1f}  "
+        f"p95 {percentile(latencies, 0.95) * 1000:.1f}  "
+        f"p99 {percentile(latencies, 0.99) * 1000:.1f}  "
+        f"max {(latencies[-1] if latencies else 0) * 1000:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test ToolCurator API endpoints")
+    parser.add_argument("urls", nargs="+", help="URLs on one host to request (round-robin)")
+    parser.add_argument("-c", "--concurrency", type=int, default=100, help="concurrent connections")
+    parser.add_argument("-d", "--duration", type=float, default=10, help="seconds to run")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.urls, args.concurrency, args.duration, args.timeout))
@@ -1,15 +1,12 @@
-import requests
 import os
-from PIL import Image
-from io import BytesIO
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables (before importing modules that read settings)
 load_dotenv()
 
-# Set the path to your screenshots directory
-PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
-SCREENSHOTS_DIR = os.path.join(PROJECT_ROOT, "backend", "static", "screenshots")
+from backend.screenshot_capture import capture_screenshot
+from backend.screenshot_store import digest_from_url
+from backend.screenshot_variants import SCREENSHOTS_DIR
 
 # Tool details
 TOOL_NAME = "AutoWrite"
@@ -31,53 +28,6 @@ def get_tool_url_from_db():
     return None
 
 
-def save_screenshot(url, name):
-    """
-    Save a screenshot for ReconXi.
-
-    Args:
-        url (str): URL of ReconXi
-        name (str): Name of the tool (ReconXi)
-
-    Returns:
-        str or None: Path to saved screenshot, or None if failed
-    """
-    try:
-        filename = f"{name.replace(' ', '_').lower()}.png"
-        save_path = os.path.join(SCREENSHOTS_DIR, filename)
-
-        if not url or url.strip() == "":
-            print(f"No URL provided for {name}, cannot take screenshot.")
-            return None
-
-        api_key = os.getenv("SCREENSHOTONE_API_KEY")
-        if not api_key:
-            print("SCREENSHOTONE_API_KEY not found in environment variables")
-            return None
-
-        screenshot_url = f"https://api.screenshotone.com/take?access_key={api_key}&url={url}&viewport_width=1280&viewport_height=800&format=png"
-
-        print(f"Taking screenshot of {url}...")
-        response = requests.get(screenshot_url)
-
-        if response.status_code == 200:
-            img = Image.open(BytesIO(response.content))
-
-            # Ensure the directory exists
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-
-            img.save(save_path)
-            print(f"Screenshot saved to {save_path}")
-            return f"/static/screenshots/{filename}"
-        else:
-            print(f"Error taking screenshot: HTTP {response.status_code}")
-            print(f"Response: {response.text}")
-            return None
-    except Exception as e:
-        print(f"Exception while taking screenshot: {e}")
-        return None
-
-
 def update_reconxi_screenshot():
     """
     Takes a screenshot of ReconXi and updates its screenshot URL in the database.
@@ -94,15 +44,23 @@ def update_reconxi_screenshot():
         print("ERROR: No URL available for ReconXi. Please set TOOL_URL in the script.")
         return
 
+    if not os.getenv("SCREENSHOTONE_API_KEY"):
+        print("SCREENSHOTONE_API_KEY not found in environment variables")
+        return
+
     print(f"Generating screenshot for {TOOL_NAME} ({url})...")
-    screenshot_path = save_screenshot(url, TOOL_NAME)
+    screenshot_path, error = capture_screenshot(url, TOOL_NAME)
 
     if screenshot_path:
         print(f"🖼️ Successfully saved screenshot: {screenshot_path}")
         print(f"To update the database, you would run:")
         print(f"UPDATE ai_tools SET screenshot_url = '{screenshot_path}' WHERE name = '{TOOL_NAME}';")
+        print(f"INSERT INTO screenshot_manifest (tool_id, content_hash, file_exists, captured_at) "
+              f"SELECT id, '{digest_from_url(screenshot_path)}', TRUE, NOW() FROM ai_tools WHERE name = '{TOOL_NAME}' "
+              f"ON CONFLICT (tool_id) DO UPDATE SET content_hash = EXCLUDED.content_hash, file_exists = TRUE, "
+              f"captured_at = NOW(), last_error = NULL, updated_at = NOW();")
     else:
-        print(f"❌ Failed to generate screenshot for {TOOL_NAME}")
+        print(f"❌ Failed to generate screenshot for {TOOL_NAME}: {error}")
 
 
 if __name__ == "__main__":
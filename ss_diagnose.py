@@ -1,14 +1,16 @@
-import requests
 import psycopg2
 import os
-import urllib.parse
-from PIL import Image
-from io import BytesIO
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables (before importing modules that read settings)
 load_dotenv()
 
+from backend.catalog_version import bump_catalog_version
+from backend.schema import run_migrations
+from backend.screenshot_capture import capture_screenshot
+from backend.screenshot_store import record_screenshots
+from backend.screenshot_variants import SCREENSHOTS_DIR
+
 # Specific tools to process
 TOOLS_TO_SCREENSHOT = [
     {
@@ -49,10 +51,6 @@ TOOLS_TO_SCREENSHOT = [
     }
 ]
 
-# Set the path to your screenshots directory
-PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
-SCREENSHOTS_DIR = os.path.join(PROJECT_ROOT, "backend", "static", "screenshots")
-
 
 def get_db_connection():
     return psycopg2.connect(
@@ -64,52 +62,10 @@ def get_db_connection():
     )
 
 
-def save_screenshot(url, name):
-    """
-    Save a screenshot for a given tool.
-
-    Args:
-        url (str): URL of the tool
-        name (str): Name of the tool
-
-    Returns:
-        str or None: Path to saved screenshot, or None if failed
-    """
-    try:
-        filename = f"{name.replace(' ', '_').lower()}.png"
-        save_path = os.path.join(SCREENSHOTS_DIR, filename)
-
-        if not url or url.strip() == "":
-            print(f"No URL provided for {name}, skipping...")
-            return None
-
-        api_key = os.getenv("SCREENSHOTONE_API_KEY")
-        screenshot_url = f"https://api.screenshotone.com/take?access_key={api_key}&url={url}&viewport_width=1280&viewport_height=800&format=png"
-
-        print(f"Attempting to capture screenshot for {name} from {url}")
-
-        response = requests.get(screenshot_url)
-        if response.status_code == 200:
-            img = Image.open(BytesIO(response.content))
-
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-
-            img.save(save_path)
-            print(f"✅ Screenshot saved for {name}")
-            return f"/static/screenshots/{filename}"
-        else:
-            print(f"❌ Error taking screenshot for {name}: HTTP {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"❌ Exception while taking screenshot for {name}: {e}")
-        return None
-
-
 def update_targeted_screenshots():
     """
     Update screenshots for specific tools.
     """
-    print(f"Project root: {PROJECT_ROOT}")
     print(f"Using screenshot directory: {SCREENSHOTS_DIR}")
 
     # Ensure screenshot directory exists
@@ -123,18 +79,22 @@ def update_targeted_screenshots():
         url = tool['url']
 
         print(f"\nProcessing {name}...")
-        screenshot_path = save_screenshot(url, name)
+        print(f"Attempting to capture screenshot for {name} from {url}")
+        screenshot_path, error = capture_screenshot(url, name)
 
         if screenshot_path:
+            print(f"✅ Screenshot saved for {name}")
             # Update the database with the new screenshot path
             cur.execute(
-                "UPDATE ai_tools SET screenshot_url = %s WHERE name = %s;",
+                "UPDATE ai_tools SET screenshot_url = %s WHERE lower(name) = lower(%s) RETURNING id;",
                 (screenshot_path, name)
             )
+            record_screenshots(cur, [(tool_id, screenshot_path) for tool_id, in cur.fetchall()])
             print(f"Updated database for {name}")
         else:
-            print(f"Failed to update screenshot for {name}")
+            print(f"❌ Failed to update screenshot for {name}: {error}")
 
+    bump_catalog_version(cur)
     conn.commit()
     cur.close()
     conn.close()
@@ -143,4 +103,5 @@ def update_targeted_screenshots():
 
 
 if __name__ == "__main__":
+    run_migrations()
     update_targeted_screenshots()
\ No newline at end of file
@@ -11,6 +11,9 @@ import time
 import os
 from dotenv import load_dotenv
 
+from backend.schema import run_migrations
+from backend.tool_writer import write_tools
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -29,25 +32,6 @@ def connect_db():
     return psycopg2.connect(**DB_CONFIG)
 
 
-# Function to create table if it doesn't exist
-def create_table():
-    conn = connect_db()
-    cur = conn.cursor()
-    cur.execute('''
-        CREATE TABLE IF NOT EXISTS ai_tools (
-            id SERIAL PRIMARY KEY,
-            name TEXT,
-            description TEXT,
-            category TEXT,
-            source TEXT,
-            source_url TEXT UNIQUE
-        )
-    ''')
-    conn.commit()
-    cur.close()
-    conn.close()
-
-
 # Function to scrape FutureTools.io Newly Added page
 def scrape_futuretools():
     url = "https://www.futuretools.io/newly-added"
@@ -103,24 +87,22 @@ def scrape_futuretools():
     return tools
 
 
+# Columns of each scraped tool tuple, in order
+TOOL_COLUMNS = ("name", "short_description", "category", "source", "source_url")
+
+
 # Function to store data in PostgreSQL
 def store_data(tools):
     conn = connect_db()
-    cur = conn.cursor()
-
-    for tool in tools:
-        cur.execute(
-            "INSERT INTO ai_tools (name, description, category, source, source_url) VALUES (%s, %s, %s, %s, %s) ON CONFLICT (source_url) DO NOTHING",
-            tool
-        )
-
-    conn.commit()
-    cur.close()
-    conn.close()
+    try:
+        inserted, skipped = write_tools(conn, TOOL_COLUMNS, tools)
+    finally:
+        conn.close()
+    return inserted, skipped
 
 
 if __name__ == "__main__":
-    create_table()
+    run_migrations()
     tools = scrape_futuretools()
-    store_data(tools)
-    print(f"Scraped and stored {len(tools)} AI tools from FutureTools.io Newly Added!")
+    inserted, skipped = store_data(tools)
+    print(f"Scraped {len(tools)} AI tools from FutureTools.io Newly Added: stored {inserted} new, skipped {skipped} already known")
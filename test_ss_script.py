@@ -1,21 +1,12 @@
 import os
+import time
 import psycopg2
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables (before importing modules that read settings)
 load_dotenv()
 
-# Set the path to your screenshots directory
-PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
-SCREENSHOTS_DIR = os.path.join(PROJECT_ROOT, "backend", "static", "screenshots")
-
-SOURCES = [
-    "FutureTools.io",
-    "Toolify.ai",
-    "There's an AI for That",
-    "AI Top Tools",
-    "AI Tools Directory"
-]
+from backend.schema import run_migrations
 
 
 def get_db_connection():
@@ -30,65 +21,43 @@ def get_db_connection():
 
 def check_screenshot_status():
     """
-    Comprehensive diagnostic of tool screenshots
+    Comprehensive diagnostic of tool screenshots, built from the screenshot
+    manifest (no filesystem access)
     """
+    started = time.perf_counter()
     conn = get_db_connection()
     cur = conn.cursor()
 
-    # Fetch all tools
+    # Tools by source
+    cur.execute("SELECT source, count(*) FROM ai_tools GROUP BY source ORDER BY source")
+    tools_by_source = cur.fetchall()
+
+    # Tools with issues: no manifest entry, file missing/empty, or no local screenshot URL
+    cur.execute("""
+        SELECT t.name, t.source, t.source_url, t.screenshot_url,
+               coalesce(m.file_exists, FALSE), coalesce(m.size_bytes, 0), m.captured_at, m.last_error
+        FROM ai_tools t
+        LEFT JOIN screenshot_manifest m ON m.tool_id = t.id
+        WHERE m.file_exists IS NOT TRUE
+           OR t.screenshot_url IS NULL
+           OR t.screenshot_url NOT LIKE '%/static/screenshots/%'
+        ORDER BY t.source, t.name
+    """)
+    tools_without_screenshots = cur.fetchall()
+
+    # Check for invalid source URLs
     cur.execute("""
-        SELECT name, source, source_url, screenshot_url 
-        FROM ai_tools 
+        SELECT name FROM ai_tools
+        WHERE source_url IS NULL OR trim(source_url) = ''
         ORDER BY source, name
     """)
-    tools = cur.fetchall()
+    tools_with_invalid_urls = [row[0] for row in cur.fetchall()]
 
     cur.close()
     conn.close()
+    elapsed_ms = (time.perf_counter() - started) * 1000
 
-    # Diagnostic variables
-    total_tools = len(tools)
-    tools_by_source = {}
-    tools_without_screenshots = []
-    tools_with_invalid_urls = []
-
-    # Analyze each tool
-    for name, source, source_url, screenshot_url in tools:
-        # Group tools by source
-        if source not in tools_by_source:
-            tools_by_source[source] = []
-        tools_by_source[source].append(name)
-
-        # Check screenshot filename
-        filename = f"{name.replace(' ', '_').lower()}.png"
-        file_path = os.path.join(SCREENSHOTS_DIR, filename)
-
-        # Diagnostic checks
-        screenshot_file_exists = os.path.exists(file_path)
-        screenshot_file_size = os.path.getsize(file_path) if screenshot_file_exists else 0
-
-        # Check for tools with issues
-        has_valid_screenshot = (
-                screenshot_url and
-                "/static/screenshots/" in screenshot_url and
-                screenshot_file_exists and
-                screenshot_file_size > 0
-        )
-
-        if not has_valid_screenshot:
-            issue_details = {
-                'name': name,
-                'source': source,
-                'source_url': source_url,
-                'screenshot_url': screenshot_url,
-                'file_exists': screenshot_file_exists,
-                'file_size': screenshot_file_size
-            }
-            tools_without_screenshots.append(issue_details)
-
-        # Check for invalid source URLs
-        if not source_url or source_url.strip() == '':
-            tools_with_invalid_urls.append(name)
+    total_tools = sum(count for _, count in tools_by_source)
 
     # Print comprehensive report
     print("=== TOOL SCREENSHOT DIAGNOSTIC REPORT ===")
@@ -96,18 +65,20 @@ def check_screenshot_status():
 
     # Print tools by source
     print("\n=== TOOLS BY SOURCE ===")
-    for source, tools in tools_by_source.items():
-        print(f"{source}: {len(tools)} tools")
+    for source, count in tools_by_source:
+        print(f"{source}: {count} tools")
 
     # Print tools without screenshots
     print("\n=== TOOLS WITHOUT VALID SCREENSHOTS ===")
-    for tool in tools_without_screenshots:
-        print(f"Tool: {tool['name']}")
-        print(f"  Source: {tool['source']}")
-        print(f"  Source URL: {tool['source_url']}")
-        print(f"  Screenshot URL in DB: {tool['screenshot_url']}")
-        print(f"  Screenshot File Exists: {tool['file_exists']}")
-        print(f"  Screenshot File Size: {tool['file_size']} bytes")
+    for name, source, source_url, screenshot_url, file_exists, file_size, captured_at, last_error in tools_without_screenshots:
+        print(f"Tool: {name}")
+        print(f"  Source: {source}")
+        print(f"  Source URL: {source_url}")
+        print(f"  Screenshot URL in DB: {screenshot_url}")
+        print(f"  Screenshot File Exists: {file_exists}")
+        print(f"  Screenshot File Size: {file_size} bytes")
+        print(f"  Captured At: {captured_at}")
+        print(f"  Last Error: {last_error}")
         print("---")
 
     # Print tools with invalid URLs
@@ -119,7 +90,9 @@ def check_screenshot_status():
     print("\n=== SUMMARY ===")
     print(f"Tools without valid screenshots: {len(tools_without_screenshots)}")
     print(f"Tools with invalid URLs: {len(tools_with_invalid_urls)}")
+    print(f"Report built from the screenshot manifest in {elapsed_ms:.0f} ms")
 
 
 if __name__ == "__main__":
+    run_migrations()
     check_screenshot_status()
\ No newline at end of file
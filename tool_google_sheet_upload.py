@@ -1,13 +1,22 @@
+import argparse
 import csv
+import io
 import os
+import sys
+import time
+from itertools import islice
+
 import psycopg2
 from dotenv import load_dotenv
 
+from backend.catalog_version import bump_catalog_version
+from backend.schema import run_migrations
+
 # Load environment variables from .env file
 load_dotenv()
 
-# CSV file path - update this to your file's location
-csv_file_path = '/Users/travisfleisher/Desktop/ToolCurator.AI - Sheet1.csv'
+# Rows per COPY batch; bounds memory regardless of the size of the export
+DEFAULT_CHUNK_SIZE = 5000
 
 
 def get_db_connection():
@@ -20,14 +29,272 @@ def get_db_connection():
     )
 
 
-def import_csv_to_postgres():
-    # Read CSV file
-    with open(csv_file_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
+# Columns copied from the sheet into ai_tools, in staging-table order
+IMPORT_COLUMNS = (
+    "name",
+    "category",
+    "source",
+    "source_url",
+    "short_description",
+    "full_description",
+    "screenshot_url",
+    "type",
+)
+
+# Written for NULL in the COPY stream so empty strings stay empty strings
+COPY_NULL = "\\N"
+
+
+def normalize_row(row):
+    """
+    Strip a CSV row and map blank optional fields to None.
+
+    Returns:
+        dict: Values for IMPORT_COLUMNS
+    """
+    values = {column: (row.get(column) or '').strip() for column in IMPORT_COLUMNS}
+    for column in ("full_description", "screenshot_url", "type"):
+        values[column] = values[column] or None
+    return values
+
+
+def create_staging_table(cur):
+    cur.execute("""
+        CREATE TEMP TABLE ai_tools_import (
+            line_no INTEGER,
+            name TEXT,
+            category TEXT,
+            source TEXT,
+            source_url TEXT,
+            short_description TEXT,
+            full_description TEXT,
+            screenshot_url TEXT,
+            type TEXT
+        ) ON COMMIT DROP
+    """)
+
+
+def copy_to_staging(cur, rows):
+    """
+    Stream normalized rows into the staging table with COPY.
+
+    Args:
+        cur: Cursor inside the import transaction
+        rows (list): (line_no, values dict) pairs
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for line_no, values in rows:
+        writer.writerow([line_no] + [
+            COPY_NULL if values[column] is None else values[column]
+            for column in IMPORT_COLUMNS
+        ])
+    buffer.seek(0)
+    cur.copy_expert(
+        f"COPY ai_tools_import (line_no, {', '.join(IMPORT_COLUMNS)}) "
+        f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+        buffer,
+    )
+
+
+def merge_staging(cur):
+    """
+    Upsert the staging table into ai_tools with a single INSERT ... ON CONFLICT.
+
+    Returns:
+        dict: inserted, updated, duplicates and duplicate_urls counts
+    """
+    cur.execute("CREATE INDEX ON ai_tools_import (name, source, line_no)")
+    cur.execute("CREATE INDEX ON ai_tools_import (source_url)")
+    cur.execute("ANALYZE ai_tools_import")
+
+    # Later lines win when the sheet lists the same tool twice
+    cur.execute("""
+        DELETE FROM ai_tools_import a USING ai_tools_import b
+        WHERE a.name = b.name AND a.source = b.source AND a.line_no < b.line_no
+    """)
+    duplicates = cur.rowcount
+
+    # source_url is UNIQUE: when another tool already owns the URL, suffix it
+    # with the line number like the row-by-row importer did
+    cur.execute("""
+        UPDATE ai_tools_import i
+        SET source_url = i.source_url || '_' || i.line_no
+        WHERE EXISTS (
+                SELECT 1 FROM ai_tools t
+                WHERE t.source_url = i.source_url
+                  AND (t.name, t.source) IS DISTINCT FROM (i.name, i.source)
+            )
+           OR EXISTS (
+                SELECT 1 FROM ai_tools_import o
+                WHERE o.source_url = i.source_url AND o.line_no < i.line_no
+            )
+    """)
+    duplicate_urls = cur.rowcount
+
+    columns = ", ".join(IMPORT_COLUMNS)
+    updates = ", ".join(
+        f"{column} = EXCLUDED.{column}"
+        for column in IMPORT_COLUMNS if column not in ("name", "source")
+    )
+    cur.execute(f"""
+        WITH merged AS (
+            INSERT INTO ai_tools ({columns})
+            SELECT {columns} FROM ai_tools_import
+            ON CONFLICT (name, source) DO UPDATE SET {updates}
+            RETURNING (xmax = 0) AS inserted
+        )
+        SELECT count(*) FILTER (WHERE inserted), count(*) FROM merged
+    """)
+    inserted, merged = cur.fetchone()
+
+    return {
+        "inserted": inserted,
+        "updated": merged - inserted,
+        "duplicates": duplicates,
+        "duplicate_urls": duplicate_urls,
+    }
+
+
+class ImportProgress:
+    """Counts rows and characters read and prints a throughput line per chunk."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.rows = 0
+        self.chars = 0
+        self.skipped = 0
+
+    def count_lines(self, lines):
+        for line in lines:
+            self.chars += len(line)
+            yield line
+
+    def report(self, final=False):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        label = "Done" if final else "Progress"
+        print(
+            f"[INFO] {label}: {self.rows} rows ({self.skipped} skipped), "
+            f"{self.chars / 1_000_000:.1f} MB read, "
+            f"{self.rows / elapsed:.0f} rows/s, {elapsed:.1f}s elapsed",
+            file=sys.stderr,
+        )
+
+
+def read_rows(stream, progress):
+    """
+    Yield (row_no, raw row) pairs from a CSV stream without buffering it.
+    """
+    reader = csv.DictReader(progress.count_lines(stream))
+    for row_no, row in enumerate(reader, start=1):
+        progress.rows = row_no
+        yield row_no, row
+
+
+def normalize_rows(rows):
+    for row_no, row in rows:
+        yield row_no, normalize_row(row), row
+
+
+def validate_rows(rows, progress):
+    for row_no, values, row in rows:
+        # Skip rows with empty name or source
+        if not values["name"] or not values["source"]:
+            progress.skipped += 1
+            print(f"Skipping row with empty name or source: {row}")
+            continue
+        yield row_no, values
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def bulk_import_rows(conn, rows, progress, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Import CSV rows in one transaction via chunked COPY + INSERT ... ON CONFLICT.
+
+    Rows flow through normalize -> validate -> batch, and each batch is
+    COPYed into the staging table, so only one chunk is held in memory.
+
+    Args:
+        conn: Database connection (committed on success)
+        rows (iterable): (row_no, raw row) pairs from read_rows()
+        progress (ImportProgress): Progress tracker fed by read_rows()
+        chunk_size (int): Rows per COPY batch
+
+    Returns:
+        dict: inserted, updated, skipped, duplicates and duplicate_urls counts
+    """
+    cur = conn.cursor()
+    try:
+        create_staging_table(cur)
+
+        for chunk in batched(validate_rows(normalize_rows(rows), progress), chunk_size):
+            copy_to_staging(cur, chunk)
+            progress.report()
+
+        counts = merge_staging(cur)
+        counts["skipped"] = progress.skipped
+
+        # Let the API drop its cached /api/tools responses
+        bump_catalog_version(cur)
+        conn.commit()
+        return counts
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def import_csv_to_postgres(path="-", bulk=True, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Import a sheet export into ai_tools.
+
+    Args:
+        path (str): CSV file path, or "-" for stdin
+        bulk (bool): Use the COPY + upsert path instead of row-by-row writes
+        chunk_size (int): Rows per COPY batch in bulk mode
+    """
+    if path == "-":
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    else:
+        stream = open(path, "r", encoding="utf-8", newline="")
+
+    progress = ImportProgress()
 
     # Connect to PostgreSQL
     conn = get_db_connection()
+    try:
+        rows = read_rows(stream, progress)
+        if bulk:
+            counts = bulk_import_rows(conn, rows, progress, chunk_size)
+            progress.report(final=True)
+            print(f"Inserted {counts['inserted']} rows")
+            print(f"Updated {counts['updated']} rows")
+            print(f"Skipped {counts['skipped']} rows")
+            print(f"Collapsed {counts['duplicates']} duplicate (name, source) rows")
+            print(f"Handled {counts['duplicate_urls']} rows with duplicate URLs")
+        else:
+            import_rows_individually(conn, (row for _, row in rows))
+            progress.report(final=True)
+    finally:
+        conn.close()
+        if path != "-":
+            stream.close()
+
+
+def import_rows_individually(conn, rows):
+    """
+    Original row-at-a-time import (SELECT then UPDATE/INSERT, commit per row).
+    Kept for debugging a single problematic sheet row.
+    """
     cur = conn.cursor()
 
     # Track successful imports
@@ -38,14 +305,15 @@ def import_csv_to_postgres():
     # Process each row
     for row in rows:
         # Prepare values
-        name = row.get('name', '').strip()
-        category = row.get('category', '').strip()
-        source = row.get('source', '').strip()
-        source_url = row.get('source_url', '').strip()
-        short_description = row.get('short_description', '').strip()
-        full_description = row.get('full_description', '').strip() or None
-        screenshot_url = row.get('screenshot_url', '').strip() or None
-        tool_type = row.get('type', '').strip() or None
+        values = normalize_row(row)
+        name = values['name']
+        category = values['category']
+        source = values['source']
+        source_url = values['source_url']
+        short_description = values['short_description']
+        full_description = values['full_description']
+        screenshot_url = values['screenshot_url']
+        tool_type = values['type']
 
         # Skip rows with empty name or source
         if not name or not source:
@@ -136,13 +404,15 @@ def import_csv_to_postgres():
             conn.rollback()
             print(f"Error processing {name}: {e}")
 
+    # Let the API drop its cached /api/tools responses
+    bump_catalog_version(cur)
+    conn.commit()
+
     print(f"Successfully processed {processed_count} rows")
     print(f"Skipped {skipped_count} rows")
     print(f"Handled {duplicate_url_count} rows with duplicate URLs")
 
-    # Close connection
     cur.close()
-    conn.close()
 
 
 def verify_data():
@@ -158,5 +428,12 @@ def verify_data():
 
 
 if __name__ == "__main__":
-    import_csv_to_postgres()
+    parser = argparse.ArgumentParser(description="Import a ToolCurator sheet export (CSV) into ai_tools")
+    parser.add_argument("path", nargs="?", default="-", help="CSV file to import, or - for stdin (default)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per COPY batch")
+    parser.add_argument("--row-by-row", action="store_true", help="use the old one-row-per-transaction import")
+    args = parser.parse_args()
+
+    run_migrations()
+    import_csv_to_postgres(args.path, bulk=not args.row_by_row, chunk_size=args.chunk_size)
     verify_data()
\ No newline at end of file